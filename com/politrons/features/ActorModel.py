@@ -1,16 +1,247 @@
+import asyncio
+import inspect
+import itertools
+import os
+import threading
+import time
 import uuid
-
-import pykka
+from collections import deque
+from concurrent.futures import Future
+from typing import Any, Callable, Deque, List, Optional
 
 """We define the message as the contracts between the client and the actor model"""
 C3PO = object()
 
 R2D2 = object()
 
-class Droid(pykka.ThreadingActor):
-    """with [pykka] we're able to create Actor model, just like in Akka.
-    We just have to create a class that has [pykka.ThreadingActor] as part of the
-    class declaration.
+
+#  Runtime
+# ---------
+
+class ActorFuture:
+    """The future answer of an [ask], with the same operators as pykka's futures:
+    [get] blocks until the answer arrives, [map] and [filter] transform it without blocking.
+    An async [on_receive] awaits it instead, so the dispatcher keeps running other actors meanwhile."""
+
+    def __init__(self, future: Future, dispatcher: "_Dispatcher") -> None:
+        self._future = future
+        self._dispatcher = dispatcher  # The one running the actor that answers
+
+    def get(self, timeout: Optional[float] = None) -> Any:
+        if not self._future.done() and threading.current_thread() is self._dispatcher.thread:
+            raise RuntimeError("blocking on the answer of an actor of the same dispatcher would never return, "
+                               "await it from an async on_receive")
+        return self._future.result(timeout)
+
+    def __await__(self):
+        return asyncio.wrap_future(self._future).__await__()
+
+    def map(self, func: Callable[[Any], Any]) -> "ActorFuture":
+        return self._then(func)
+
+    def filter(self, func: Callable[[Any], bool]) -> "ActorFuture":
+        # Like pykka, filter applies to the items of an iterable answer
+        return self._then(lambda answer: [item for item in answer if func(item)])
+
+    def _then(self, func: Callable[[Any], Any]) -> "ActorFuture":
+        out: Future = Future()
+
+        def done(future: Future) -> None:
+            try:
+                out.set_result(func(future.result()))
+            except BaseException as ex:
+                out.set_exception(ex)
+
+        self._future.add_done_callback(done)
+        return ActorFuture(out, self._dispatcher)
+
+    def __repr__(self) -> str:
+        return f"<ActorFuture {'done' if self._future.done() else 'pending'}>"
+
+
+class _Dispatcher:
+    """One thread running one event loop, shared by every actor assigned to it.
+    Actors with messages wait in a ready queue that the loop drains in one callback, so a burst of
+    tells to many idle actors costs a single cross-thread wakeup."""
+
+    def __init__(self, name: str) -> None:
+        self.loop = asyncio.new_event_loop()
+        self._ready: Deque["ActorRef"] = deque()
+        self._wakeup_pending = False
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def schedule(self, actor_ref: "ActorRef") -> None:
+        self._ready.append(actor_ref)
+        if not self._wakeup_pending:
+            self._wakeup_pending = True
+            # From the dispatcher thread itself no cross-thread wakeup is needed
+            if threading.current_thread() is self.thread:
+                self.loop.call_soon(self._drain)
+            else:
+                self.loop.call_soon_threadsafe(self._drain)
+
+    def _drain(self) -> None:
+        # Cleared before popping: an actor appended from now on either is popped below or triggers a new wakeup
+        self._wakeup_pending = False
+        ready = self._ready
+        # Only the actors ready when the turn started, so other loop callbacks (async on_receive) get their turn
+        for _ in range(len(ready)):
+            ready.popleft()._turn()
+
+    def stop(self) -> None:
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+class ActorSystem:
+    """Runs any number of actors on `threads` dispatcher threads (one event loop each).
+    An actor is only scheduled while its mailbox has messages: each turn processes up to `throughput`
+    messages, then the actor goes back to the end of its loop's queue so others get their turn."""
+
+    def __init__(self, threads: Optional[int] = None, throughput: int = 100) -> None:
+        if throughput < 1:
+            raise ValueError("throughput must be positive")
+        self.throughput = throughput
+        self._dispatchers = [_Dispatcher(f"actor-dispatcher-{i}") for i in range(threads or os.cpu_count() or 4)]
+        self._next = itertools.cycle(self._dispatchers)
+
+    def spawn(self, actor_class: type, *args, **kwargs) -> "ActorRef":
+        actor = actor_class(*args, **kwargs)
+        return ActorRef(actor, next(self._next), self.throughput)
+
+    def shutdown(self) -> None:
+        for dispatcher in self._dispatchers:
+            dispatcher.stop()
+
+
+_default_system: Optional[ActorSystem] = None
+_default_lock = threading.Lock()
+
+
+def default_system() -> ActorSystem:
+    """The system used by [Actor.start], created on first use."""
+    global _default_system
+    if _default_system is None:
+        with _default_lock:
+            if _default_system is None:
+                _default_system = ActorSystem()
+    return _default_system
+
+
+class ActorRef:
+    """The handle to talk to an actor: [tell] and [ask] just enqueue the message, from any thread."""
+
+    def __init__(self, actor: "Actor", dispatcher: _Dispatcher, throughput: int) -> None:
+        self._actor = actor
+        self._dispatcher = dispatcher
+        self._throughput = throughput
+        self._mailbox: Deque[tuple[Any, Optional[Future]]] = deque()
+        self._lock = threading.Lock()
+        self._scheduled = False
+        self._stopped = False
+        actor.actor_ref = self
+
+    def tell(self, message: Any) -> None:
+        """Fire and forget."""
+        self._enqueue(message, None)
+
+    def ask(self, message: Any, block: bool = True, timeout: Optional[float] = None) -> Any:
+        """Send a message expecting an answer: the answer itself with `block=True`, an [ActorFuture] otherwise."""
+        future: Future = Future()
+        self._enqueue(message, future)
+        if not block:
+            return ActorFuture(future, self._dispatcher)
+        if threading.current_thread() is self._dispatcher.thread:
+            raise RuntimeError("a blocking ask from an actor of the same dispatcher would never be answered")
+        return future.result(timeout)
+
+    def stop(self) -> None:
+        """The messages already in the mailbox are processed, the ones sent afterwards are rejected."""
+        self._stopped = True
+
+    def _enqueue(self, message: Any, future: Optional[Future]) -> None:
+        if self._stopped:
+            raise RuntimeError(f"actor {self._actor!r} is stopped")
+        with self._lock:
+            self._mailbox.append((message, future))
+            if self._scheduled:
+                return
+            self._scheduled = True
+        # Only the first message of an idle actor schedules it, the others are picked up in the same turn
+        self._dispatcher.schedule(self)
+
+    def _turn(self) -> None:
+        mailbox = self._mailbox
+        for _ in range(self._throughput):
+            if not mailbox:
+                break
+            message, future = mailbox.popleft()
+            try:
+                answer = self._actor.on_receive(message)
+            except BaseException as ex:
+                self._failed(ex, future)
+                continue
+            if inspect.isawaitable(answer):
+                # An async on_receive: the actor resumes its mailbox once the coroutine is done
+                self._dispatcher.loop.create_task(self._resume(answer, future))
+                return
+            if future is not None:
+                future.set_result(answer)
+        self._reschedule()
+
+    async def _resume(self, answer, future: Optional[Future]) -> None:
+        try:
+            answer = await answer
+        except BaseException as ex:
+            self._failed(ex, future)
+        else:
+            if future is not None:
+                future.set_result(answer)
+        self._reschedule()
+
+    def _reschedule(self) -> None:
+        with self._lock:
+            if not self._mailbox:
+                self._scheduled = False
+                return
+        self._dispatcher.schedule(self)
+
+    def _failed(self, ex: BaseException, future: Optional[Future]) -> None:
+        if future is not None:
+            future.set_exception(ex)
+        else:
+            self._actor.on_failure(ex)
+
+
+class Actor:
+    """Base class of the actors: implement [on_receive], which may also be a coroutine function.
+    An actor processes one message at a time, so its state needs no lock."""
+
+    actor_ref: ActorRef
+
+    @classmethod
+    def start(cls, *args, **kwargs) -> ActorRef:
+        # Same entry point as pykka, on the shared default system instead of a new thread per actor
+        return default_system().spawn(cls, *args, **kwargs)
+
+    def on_receive(self, message: Any) -> Any:
+        raise NotImplementedError
+
+    def on_failure(self, ex: BaseException) -> None:
+        # A [tell] has nobody to answer to
+        print(f"{type(self).__name__} failed processing a message: {ex!r}")
+
+
+#  Actors
+# ---------
+
+class Droid(Actor):
+    """With the actor runtime above we're able to create Actor model, just like in Akka.
+    We just have to create a class that has [Actor] as part of the class declaration.
     Then we have to implement the [on_receive] function where we expect to receive the message."""
 
     def __init__(self, name=uuid.uuid4().hex):
@@ -24,6 +255,27 @@ class Droid(pykka.ThreadingActor):
             return f'Bip, bip bip bip bip {self.name}'
 
 
+class Counter(Actor):
+    def __init__(self) -> None:
+        self.count = 0
+
+    def on_receive(self, message):
+        if message == "get":
+            return self.count
+        self.count += message
+
+
+class Greeter(Actor):
+    """An async [on_receive] can await the answer of other actors, even the ones on its own dispatcher."""
+
+    def __init__(self, droid: ActorRef) -> None:
+        self.droid = droid
+
+    async def on_receive(self, message):
+        answer = await self.droid.ask(message, block=False)
+        return f"The droid says: {answer}"
+
+
 def fire_and_forget_pattern():
     """With this pattern we just send a message to the actor, and we don't expect any response"""
     actor_ref = Droid.start()
@@ -59,8 +311,34 @@ def akka_future():
     print(future_2.get(10))
 
 
+def async_ask():
+    """An actor awaiting the [ask] of another actor on the same dispatcher thread, without blocking it."""
+    system = ActorSystem(threads=1)
+    greeter = system.spawn(Greeter, system.spawn(Droid, "R2"))
+    print(greeter.ask(R2D2, timeout=10))
+    system.shutdown()
+
+
+def many_actors():
+    """Actors are just a mailbox and some state: 100k of them share the few dispatcher threads of the system,
+    and each scheduling turn processes a batch of messages of one actor."""
+    system = ActorSystem(threads=4, throughput=64)
+    start = time.perf_counter()
+    counters: List[ActorRef] = [system.spawn(Counter) for _ in range(100_000)]
+    for counter in counters:
+        for n in range(10):
+            counter.tell(n)
+    answers = [counter.ask("get", block=False) for counter in counters]
+    total = sum(answer.get(60) for answer in answers)
+    print(f"{len(counters)} actors counted {total} in {time.perf_counter() - start:.2f}s "
+          f"with {threading.active_count()} threads")
+    system.shutdown()
+
+
 if __name__ == "__main__":
     fire_and_forget_pattern()
     request_response_pattern()
     ask_pattern()
     akka_future()
+    async_ask()
+    many_actors()
@@ -1,21 +1,503 @@
 import asyncio
-from typing import Generic, TypeVar
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from enum import Enum
+from multiprocessing import shared_memory
+from typing import Deque, Generic, Iterable, List, Optional, TypeVar, Union
 
 T = TypeVar("T")
 
+
+class ChannelClosed(Exception):
+    """Raised by [send] on a closed channel, and by [receive] once a closed channel is drained."""
+
+
 class PyChannel(Generic[T]):
-    """A small channel wrapper over asyncio.Queue."""
+    """A channel for coroutines of one event loop.
+    Items live in a deque and waiting coroutines are parked on plain futures, so a batch of items
+    costs one wakeup instead of one await per item as with asyncio.Queue."""
+
     def __init__(self, maxsize: int = 0) -> None:
         # maxsize=0 => unbounded; >0 => bounded (backpressure)
-        self._queue: asyncio.Queue[T] = asyncio.Queue(maxsize=maxsize)
+        self._maxsize = maxsize
+        self._items: Deque[T] = deque()
+        self._getters: Deque[asyncio.Future] = deque()  # receivers (and selects) waiting for an item
+        self._putters: Deque[asyncio.Future] = deque()  # senders waiting for space
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    @property
+    def closed(self) -> bool:
+        return self._closed
+
+    def _full(self) -> bool:
+        return 0 < self._maxsize <= len(self._items)
 
     async def send(self, item: T) -> None:
         """Suspend until there's space if bounded."""
-        await self._queue.put(item)
+        while self._full() and not self._closed:
+            await self._park(self._putters)
+        if self._closed:
+            raise ChannelClosed("send on a closed channel")
+        self._items.append(item)
+        _wake(self._getters, 1)
+
+    async def send_batch(self, items: Iterable[T]) -> None:
+        """Send every item, waking at most one receiver per item sent in one go.
+        On a bounded channel it suspends only when the channel fills up in the middle of the batch."""
+        added = 0
+        for item in items:
+            if self._full():
+                # Let the receivers drain what was added so far before waiting for space
+                _wake(self._getters, added)
+                added = 0
+                while self._full() and not self._closed:
+                    await self._park(self._putters)
+            if self._closed:
+                raise ChannelClosed("send on a closed channel")
+            self._items.append(item)
+            added += 1
+        _wake(self._getters, added)
 
     async def receive(self) -> T:
         """Suspend until an item is available."""
-        return await self._queue.get()
+        while not self._items:
+            if self._closed:
+                raise ChannelClosed("receive on a closed and drained channel")
+            await self._park(self._getters)
+        return self._take()
+
+    async def receive_batch(self, max_n: int, timeout: Optional[float] = None) -> list[T]:
+        """Wait for at least one item (at most `timeout` seconds, then return an empty list), and return up to
+        `max_n` of the items already in the channel, all from a single wakeup.
+        An empty list is also returned once the channel is closed and drained."""
+        if max_n < 1:
+            raise ValueError("max_n must be positive")
+        if not self._items and not self._closed:
+            try:
+                await asyncio.wait_for(self._wait_item(), timeout)
+            except asyncio.TimeoutError:
+                return []
+        batch = [self._items.popleft() for _ in range(min(max_n, len(self._items)))]
+        if batch:
+            _wake(self._putters, len(batch))
+            if self._items:
+                _wake(self._getters, 1)
+        return batch
+
+    def close(self) -> None:
+        """No more sends: receivers get the items left, then [ChannelClosed] (or the end of `async for`)."""
+        self._closed = True
+        _wake(self._getters, len(self._getters))
+        _wake(self._putters, len(self._putters))
+
+    def __aiter__(self) -> "PyChannel[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return await self.receive()
+        except ChannelClosed:
+            raise StopAsyncIteration
+
+    def _take(self) -> T:
+        item = self._items.popleft()
+        _wake(self._putters, 1)
+        return item
+
+    async def _wait_item(self) -> None:
+        while not self._items and not self._closed:
+            await self._park(self._getters)
+
+    async def _park(self, waiters: Deque[asyncio.Future]) -> None:
+        waiter = asyncio.get_running_loop().create_future()
+        waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Woken up and cancelled at the same time: hand the wakeup over to the next waiter
+            if waiter.done() and not waiter.cancelled():
+                _wake(waiters, 1)
+            raise
+        finally:
+            if waiter in waiters:
+                waiters.remove(waiter)
+
+
+def _wake(waiters: Deque[asyncio.Future], n: int) -> None:
+    # Wake up to n waiters; the ones already woken (e.g. a select woken by another channel) don't count
+    while n > 0 and waiters:
+        waiter = waiters.popleft()
+        if not waiter.done():
+            waiter.set_result(None)
+            n -= 1
+
+
+async def select(*channels: PyChannel[T]) -> tuple[PyChannel[T], T]:
+    """Receive from whichever channel has an item first, returning (channel, item).
+    Channels are tried in order, so list the most important first. Closed and drained channels are skipped;
+    [ChannelClosed] is raised when every channel is."""
+    while True:
+        for channel in channels:
+            if channel._items:
+                return channel, channel._take()
+        if all(channel._closed for channel in channels):
+            raise ChannelClosed("select on closed channels")
+        # One future parked on every channel: the first send (or close) on any of them wakes it
+        waiter = asyncio.get_running_loop().create_future()
+        for channel in channels:
+            channel._getters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                for channel in channels:
+                    if channel._items:
+                        _wake(channel._getters, 1)
+            raise
+        finally:
+            for channel in channels:
+                if waiter in channel._getters:
+                    channel._getters.remove(waiter)
+
+
+class Overflow(Enum):
+    """What a full [RingChannel] does with a new item."""
+    BLOCK = "block"  # the sender waits for space, like a bounded PyChannel
+    DROP_OLDEST = "drop_oldest"  # the oldest buffered item makes room for it
+    DROP_NEWEST = "drop_newest"  # the new item is discarded
+    SAMPLE = "sample"  # one of every `sample_every` new items replaces the oldest, the others are discarded
+
+
+class _Ring(Generic[T]):
+    """Fixed array used as a circular buffer: the storage is allocated once and never grows or shifts."""
+    __slots__ = ("_slots", "_head", "_size", "peak")
+
+    def __init__(self, capacity: int) -> None:
+        self._slots: List[Optional[T]] = [None] * capacity
+        self._head = 0
+        self._size = 0
+        self.peak = 0  # highest size reached
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(self, item: T) -> None:
+        # The channel checks for room first, this only guards the live slots from being overwritten
+        if self._size == len(self._slots):
+            raise IndexError("append to a full ring")
+        self._slots[(self._head + self._size) % len(self._slots)] = item
+        self._size += 1
+        if self._size > self.peak:
+            self.peak = self._size
+
+    def popleft(self) -> T:
+        if not self._size:
+            raise IndexError("pop from an empty ring")
+        item = self._slots[self._head]
+        self._slots[self._head] = None
+        self._head = (self._head + 1) % len(self._slots)
+        self._size -= 1
+        return item
+
+
+class RingChannel(PyChannel[T]):
+    """A bounded PyChannel over a preallocated ring buffer that can shed load instead of stalling the sender.
+    Everything runs on one event loop, so the ring needs no lock. [offer] is the non-suspending send for hot loops.
+    `dropped` counts the discarded items and `high_water_mark` the highest number of items buffered."""
+
+    def __init__(self, capacity: int, overflow: Union[Overflow, str] = Overflow.BLOCK, sample_every: int = 10) -> None:
+        if capacity < 1:
+            raise ValueError("capacity must be positive")
+        if sample_every < 1:
+            raise ValueError("sample_every must be positive")
+        super().__init__(maxsize=capacity)
+        self._items = _Ring(capacity)
+        self._overflow = Overflow(overflow)
+        self._sample_every = sample_every
+        self._overflowed = 0  # items that arrived while full, for SAMPLE
+        self.dropped = 0
+
+    @property
+    def high_water_mark(self) -> int:
+        return self._items.peak
+
+    def offer(self, item: T) -> bool:
+        """Add the item without suspending and return whether it was kept. With BLOCK a full channel rejects it."""
+        if self._closed:
+            raise ChannelClosed("send on a closed channel")
+        kept = self._add(item)
+        if kept:
+            _wake(self._getters, 1)
+        return kept
+
+    async def send(self, item: T) -> None:
+        if self._overflow is Overflow.BLOCK:
+            await super().send(item)
+        else:
+            self.offer(item)
+
+    async def send_batch(self, items: Iterable[T]) -> None:
+        if self._overflow is Overflow.BLOCK:
+            await super().send_batch(items)
+            return
+        if self._closed:
+            raise ChannelClosed("send on a closed channel")
+        kept = sum(self._add(item) for item in items)
+        _wake(self._getters, kept)
+
+    def _add(self, item: T) -> bool:
+        if self._full():
+            self._overflowed += 1
+            if (self._overflow is Overflow.BLOCK or self._overflow is Overflow.DROP_NEWEST
+                    or (self._overflow is Overflow.SAMPLE and self._overflowed % self._sample_every)):
+                self.dropped += 1
+                return False
+            self._items.popleft()
+            self.dropped += 1
+        self._items.append(item)
+        return True
+
+
+class ThreadChannel(Generic[T]):
+    """A channel from threads to the coroutines of one event loop.
+    Threads [send] under a lock (blocking while a bounded channel is full); the loop is only woken with
+    call_soon_threadsafe when a receiver is actually parked, and once per burst, not once per item."""
+
+    def __init__(self, maxsize: int = 0) -> None:
+        self._maxsize = maxsize
+        self._items: Deque[T] = deque()
+        self._lock = threading.Lock()
+        self._not_full = threading.Condition(self._lock)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._getters: List[asyncio.Future] = []  # receivers parked on the loop
+        self._wakeup_scheduled = False
+        self._closed = False
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def send(self, item: T, timeout: Optional[float] = None) -> None:
+        """Called from any thread. Blocks while the channel is full, raising TimeoutError after `timeout` seconds."""
+        self.send_batch((item,), timeout)
+
+    def send_batch(self, items: Iterable[T], timeout: Optional[float] = None) -> None:
+        """Called from any thread: all the items go in under one lock and cost at most one loop wakeup."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._lock:
+            for item in items:
+                if self._full() and not self._closed:
+                    # The loop must drain what is already buffered before there is room for the rest
+                    self._schedule_wakeup()
+                    remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+                    if not self._not_full.wait_for(lambda: self._closed or not self._full(), remaining):
+                        raise TimeoutError(f"channel still full after {timeout}s")
+                if self._closed:
+                    raise ChannelClosed("send on a closed channel")
+                self._items.append(item)
+            self._schedule_wakeup()
+
+    def close(self) -> None:
+        """Called from any thread. Receivers get the items left, then [ChannelClosed] (or the end of `async for`)."""
+        with self._lock:
+            self._closed = True
+            self._not_full.notify_all()
+            self._schedule_wakeup()
+
+    async def receive(self) -> T:
+        while True:
+            with self._lock:
+                if self._items:
+                    self._not_full.notify()
+                    return self._items.popleft()
+                if self._closed:
+                    raise ChannelClosed("receive on a closed and drained channel")
+                waiter = self._park()
+            await waiter
+
+    async def receive_batch(self, max_n: int, timeout: Optional[float] = None) -> List[T]:
+        """Same as [PyChannel.receive_batch]: up to `max_n` items from a single wakeup, [] on timeout or once closed and drained."""
+        if max_n < 1:
+            raise ValueError("max_n must be positive")
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                if self._items or self._closed:
+                    batch = [self._items.popleft() for _ in range(min(max_n, len(self._items)))]
+                    self._not_full.notify(len(batch))
+                    return batch
+                waiter = self._park()
+            try:
+                await asyncio.wait_for(waiter, None if deadline is None else max(0.0, deadline - time.monotonic()))
+            except asyncio.TimeoutError:
+                return []
+
+    def __aiter__(self) -> "ThreadChannel[T]":
+        return self
+
+    async def __anext__(self) -> T:
+        try:
+            return await self.receive()
+        except ChannelClosed:
+            raise StopAsyncIteration
+
+    def _full(self) -> bool:
+        return 0 < self._maxsize <= len(self._items)
+
+    def _park(self) -> asyncio.Future:
+        # Under the lock, on the loop: the receiver waits on its own future until [_wakeup]
+        self._loop = asyncio.get_running_loop()
+        waiter = self._loop.create_future()
+        self._getters.append(waiter)
+        return waiter
+
+    def _schedule_wakeup(self) -> None:
+        # Under the lock: nothing to do when no receiver is parked or a wakeup is already on its way
+        if self._getters and not self._wakeup_scheduled:
+            self._wakeup_scheduled = True
+            self._loop.call_soon_threadsafe(self._wakeup)
+
+    def _wakeup(self) -> None:
+        with self._lock:
+            self._wakeup_scheduled = False
+            getters, self._getters = self._getters, []
+        for waiter in getters:
+            if not waiter.done():
+                waiter.set_result(None)
+
+
+class SharedMemoryChannel:
+    """A channel of bytes between two processes, over a ring buffer in `multiprocessing.shared_memory`.
+    Each payload is copied into the ring behind a 4 bytes length, so nothing is pickled. There must be a single
+    sender and a single receiver: each one owns its position counter, and waiting is done by polling with backoff.
+    The channel can be passed to another process (e.g. as an argument of a ProcessPoolExecutor task); it
+    attaches to the same memory there. The process that created it calls [release] at the end."""
+
+    _POSITION = struct.Struct("<Q")
+    _LENGTH = struct.Struct("<I")
+    # read position, write position and closed flag, each on its own cache line
+    _READ, _WRITE, _CLOSED, _DATA = 0, 64, 128, 192
+
+    def __init__(self, capacity: int = 1 << 20, name: Optional[str] = None) -> None:
+        self._owner = name is None
+        if self._owner:
+            self._shm = shared_memory.SharedMemory(create=True, size=self._DATA + capacity)
+            self._shm.buf[:self._DATA] = bytes(self._DATA)
+        else:
+            # Processes started by the creator share its resource tracker, so attaching here adds nothing to clean up
+            self._shm = shared_memory.SharedMemory(name=name)
+        self._buf = self._shm.buf
+        self._capacity = self._shm.size - self._DATA
+
+    def __reduce__(self):
+        return SharedMemoryChannel, (self._capacity, self._shm.name)
+
+    @property
+    def name(self) -> str:
+        return self._shm.name
+
+    def send(self, data: Union[bytes, bytearray, memoryview], timeout: Optional[float] = None) -> None:
+        """Blocks (polling) while the ring has no room for `data`, raising TimeoutError after `timeout` seconds."""
+        size = self._LENGTH.size + len(data)
+        if size > self._capacity:
+            raise ValueError(f"payload of {len(data)} bytes does not fit in a ring of {self._capacity} bytes")
+        write = self._position(self._WRITE)
+        backoff = _Backoff(timeout)
+        while self._capacity - (write - self._position(self._READ)) < size:
+            if self._closed():
+                raise ChannelClosed("send on a closed channel")
+            backoff.wait()
+        self._copy_in(write, self._LENGTH.pack(len(data)))
+        self._copy_in(write + self._LENGTH.size, data)
+        # Publish the record only once it is fully written
+        self._POSITION.pack_into(self._buf, self._WRITE, write + size)
+
+    def receive(self, timeout: Optional[float] = None) -> bytes:
+        """Blocks (polling) until a payload is available."""
+        backoff = _Backoff(timeout)
+        while True:
+            batch = self.receive_batch(1)
+            if batch:
+                return batch[0]
+            if self._closed() and self._position(self._READ) == self._position(self._WRITE):
+                raise ChannelClosed("receive on a closed and drained channel")
+            backoff.wait()
+
+    def receive_batch(self, max_n: int) -> List[bytes]:
+        """Up to `max_n` payloads already in the ring, without waiting."""
+        read = self._position(self._READ)
+        write = self._position(self._WRITE)
+        batch = []
+        while read < write and len(batch) < max_n:
+            length = self._LENGTH.unpack(self._copy_out(read, self._LENGTH.size))[0]
+            batch.append(self._copy_out(read + self._LENGTH.size, length))
+            read += self._LENGTH.size + length
+        if batch:
+            self._POSITION.pack_into(self._buf, self._READ, read)
+        return batch
+
+    async def receive_batch_async(self, max_n: int, poll_interval: float = 0.001) -> List[bytes]:
+        """For an event loop: polls every `poll_interval` seconds (without blocking the loop) until at least one
+        payload is available, and returns up to `max_n`. An empty list means closed and drained."""
+        while True:
+            batch = self.receive_batch(max_n)
+            if batch:
+                return batch
+            if self._closed() and self._position(self._READ) == self._position(self._WRITE):
+                return []
+            await asyncio.sleep(poll_interval)
+
+    def close(self) -> None:
+        """Called by the sender: the receiver gets the payloads left, then [ChannelClosed]."""
+        self._buf[self._CLOSED] = 1
+
+    def release(self) -> None:
+        """Unmap the memory in this process, and free it when this process created the channel."""
+        self._buf = None
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
+
+    def _position(self, offset: int) -> int:
+        return self._POSITION.unpack_from(self._buf, offset)[0]
+
+    def _closed(self) -> bool:
+        return self._buf[self._CLOSED] == 1
+
+    def _copy_in(self, position: int, data) -> None:
+        start = position % self._capacity
+        data = memoryview(data).cast("B")
+        first = min(len(data), self._capacity - start)
+        self._buf[self._DATA + start:self._DATA + start + first] = data[:first]
+        if first < len(data):
+            self._buf[self._DATA:self._DATA + len(data) - first] = data[first:]
+
+    def _copy_out(self, position: int, length: int) -> bytes:
+        start = position % self._capacity
+        first = min(length, self._capacity - start)
+        data = bytes(self._buf[self._DATA + start:self._DATA + start + first])
+        if first < length:
+            data += bytes(self._buf[self._DATA:self._DATA + length - first])
+        return data
+
+
+class _Backoff:
+    """Polling pace: a few immediate retries, then sleeps growing up to 1ms."""
+
+    def __init__(self, timeout: Optional[float]) -> None:
+        self._deadline = None if timeout is None else time.monotonic() + timeout
+        self._delay = 0.0
+
+    def wait(self) -> None:
+        if self._deadline is not None and time.monotonic() >= self._deadline:
+            raise TimeoutError("shared memory channel wait timed out")
+        time.sleep(self._delay)
+        self._delay = min(0.001, self._delay * 2 or 0.00001)
 
 
 #  Main
@@ -38,5 +520,145 @@ async def simple_channel() -> None:
     prod = asyncio.create_task(producer(), name="producer")
     await asyncio.gather(prod, cons)
 
+
+async def batch_channel() -> None:
+    """[send_batch] and [receive_batch] move many items per wakeup, and [close] ends the `async for` of the
+    consumer once everything sent has been received."""
+    channel: PyChannel[int] = PyChannel(maxsize=1_000)
+
+    async def producer():
+        for start in range(0, 10_000, 500):
+            await channel.send_batch(range(start, start + 500))
+        channel.close()
+
+    async def consumer():
+        total, batches = 0, 0
+        while batch := await channel.receive_batch(max_n=256, timeout=1):
+            total += sum(batch)
+            batches += 1
+        print(f"Received {total} in {batches} batches")
+
+    await asyncio.gather(producer(), consumer())
+
+    events: PyChannel[str] = PyChannel()
+    await events.send_batch(["start", "stop"])
+    events.close()
+    print([event async for event in events])
+
+    # A batch bigger than the channel never goes over maxsize while it waits for the receiver
+    tiny: PyChannel[int] = PyChannel(maxsize=1)
+    sizes = []
+
+    async def drain():
+        for _ in range(3):
+            sizes.append(len(tiny))
+            await tiny.receive()
+
+    await asyncio.gather(tiny.send_batch([1, 2, 3]), drain())
+    print(f"Buffered at most {max(sizes)} of maxsize 1")
+
+
+async def select_channel() -> None:
+    """[select] receives from whichever channel has an item first."""
+    orders: PyChannel[str] = PyChannel()
+    alerts: PyChannel[str] = PyChannel()
+
+    async def later(channel: PyChannel[str], item: str, delay: float):
+        await asyncio.sleep(delay)
+        await channel.send(item)
+
+    asyncio.create_task(later(orders, "order-1", 0.2))
+    asyncio.create_task(later(alerts, "disk full", 0.1))
+    for _ in range(2):
+        channel, item = await select(alerts, orders)
+        print(f"{'alert' if channel is alerts else 'order'}: {item}")
+
+
+async def ring_channel() -> None:
+    """[RingChannel] sheds telemetry instead of stalling the producer when the consumer falls behind."""
+    for overflow in Overflow:
+        if overflow is Overflow.BLOCK:
+            continue
+        channel: RingChannel[int] = RingChannel(capacity=100, overflow=overflow)
+
+        async def consumer():
+            received = []
+            while batch := await channel.receive_batch(max_n=10, timeout=0.1):
+                received.extend(batch)
+                await asyncio.sleep(0.001)  # a slow consumer
+            return received
+
+        task = asyncio.create_task(consumer())
+        for sample in range(10_000):
+            channel.offer(sample)
+            if sample % 1_000 == 0:
+                await asyncio.sleep(0)
+        channel.close()
+        received = await task
+        print(f"{overflow.value}: received {len(received)}, dropped {channel.dropped}, "
+              f"high water mark {channel.high_water_mark}, last {received[-1]}")
+
+    # With BLOCK a batch bigger than the free slots waits for the consumer instead of overwriting
+    blocking: RingChannel[str] = RingChannel(capacity=2)
+    await blocking.send("a")
+    sender = asyncio.create_task(blocking.send_batch(["b", "c", "d"]))
+    received = []
+    while len(received) < 4:
+        received.extend(await blocking.receive_batch(max_n=4))
+    await sender
+    print(f"block: received {received}")
+
+
+def thread_producer(channel: ThreadChannel[int], count: int) -> None:
+    for start in range(0, count, 100):
+        channel.send_batch(range(start, start + 100))
+
+
+async def thread_channel() -> None:
+    """[ThreadChannel] lets blocking threads feed the event loop: the loop is woken once per burst of items."""
+    channel: ThreadChannel[int] = ThreadChannel(maxsize=10_000)
+    producers = [threading.Thread(target=thread_producer, args=(channel, 50_000)) for _ in range(4)]
+    for producer in producers:
+        producer.start()
+    threading.Thread(target=lambda: [p.join() for p in producers] and channel.close()).start()
+    total = 0
+    while batch := await channel.receive_batch(max_n=1_000):
+        total += len(batch)
+    print(f"Received {total} items from threads")
+
+    # A batch larger than the channel: the receiver is woken as soon as it fills up, not only at the end
+    small: ThreadChannel[int] = ThreadChannel(maxsize=10)
+    threading.Thread(target=lambda: small.send_batch(range(100)) or small.close()).start()
+    received = [item async for item in small]
+    print(f"Received {len(received)} items through a channel of 10")
+
+
+def process_producer(channel: SharedMemoryChannel, count: int) -> int:
+    for i in range(count):
+        channel.send(f"record-{i}".encode())
+    channel.close()
+    channel.release()
+    return count
+
+
+async def shared_memory_channel() -> None:
+    """[SharedMemoryChannel] moves bytes from a worker process to the event loop through shared memory, no pickling."""
+    channel = SharedMemoryChannel(capacity=64 * 1024)
+    try:
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            sent = asyncio.get_running_loop().run_in_executor(pool, process_producer, channel, 100_000)
+            received = 0
+            while batch := await channel.receive_batch_async(max_n=1_000):
+                received += len(batch)
+            print(f"Sent {await sent}, received {received} payloads")
+    finally:
+        channel.release()
+
+
 if __name__ == "__main__":
     asyncio.run(simple_channel())
+    asyncio.run(batch_channel())
+    asyncio.run(select_channel())
+    asyncio.run(ring_channel())
+    asyncio.run(thread_channel())
+    asyncio.run(shared_memory_channel())
@@ -1,4 +1,5 @@
 # Re-export public API
 from .core import PyFCollection
+from .async_core import AsyncPyFCollection
 
-__all__ = ["PyFCollection"]
+__all__ = ["PyFCollection", "AsyncPyFCollection"]
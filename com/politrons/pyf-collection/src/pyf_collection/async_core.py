@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from collections.abc import AsyncIterable, AsyncIterator, Awaitable, Iterable
+from typing import TypeVar, Generic, Callable, Optional, Union
+
+T = TypeVar("T")
+U = TypeVar("U")
+
+
+async def _from_iterable(source: Iterable[T]) -> AsyncIterator[T]:
+    for x in source:
+        yield x
+
+
+class AsyncPyFCollection(Generic[T]):
+    """
+    Lazy collection over an `async for` source (or a plain iterable).
+    Operators return a new AsyncPyFCollection, terminal operations are coroutines.
+    """
+
+    def __init__(self, source: Union[AsyncIterable[T], Iterable[T]]) -> None:
+        self._it: AsyncIterable[T] = source if isinstance(source, AsyncIterable) else _from_iterable(source)
+
+    def __aiter__(self) -> AsyncIterator[T]:
+        return self._it.__aiter__()
+
+    def __repr__(self) -> str:  # zero side-effects
+        return f"<AsyncPyFCollection at 0x{id(self):x}>"
+
+    def map(self, fn: Callable[[T], U]) -> "AsyncPyFCollection[U]":
+        async def run():
+            async for x in self._it:
+                yield fn(x)
+
+        return AsyncPyFCollection(run())
+
+    def map_async(
+            self,
+            fn: Callable[[T], Awaitable[U]],
+            concurrency: int = 1,
+            ordered: bool = True
+    ) -> "AsyncPyFCollection[U]":
+        """
+        Apply a coroutine function with up to `concurrency` calls in flight.
+        With `ordered=False` results are emitted as soon as they complete.
+        No new call is started while the consumer is not pulling, so a slow consumer
+        applies backpressure all the way to the source.
+        """
+        if concurrency < 1:
+            raise ValueError("concurrency must be positive")
+        if ordered:
+            return AsyncPyFCollection(_map_ordered(self._it, fn, concurrency))
+        return AsyncPyFCollection(_map_unordered(self._it, fn, concurrency))
+
+    def filter(self, pred: Callable[[T], bool]) -> "AsyncPyFCollection[T]":
+        async def run():
+            async for x in self._it:
+                if pred(x):
+                    yield x
+
+        return AsyncPyFCollection(run())
+
+    def flat_map(self, fn: Callable[[T], Union[AsyncIterable[U], Iterable[U]]]) -> "AsyncPyFCollection[U]":
+        async def run():
+            async for x in self._it:
+                out = fn(x)
+                if isinstance(out, AsyncIterable):
+                    async for y in out:
+                        yield y
+                else:
+                    for y in out:
+                        yield y
+
+        return AsyncPyFCollection(run())
+
+    def distinct(self, value: T) -> "AsyncPyFCollection[T]":
+        return self.filter(lambda x: x != value)
+
+    def take(self, n: int) -> "AsyncPyFCollection[T]":
+        return self.slice(0, n)
+
+    def drop(self, n: int) -> "AsyncPyFCollection[T]":
+        return self.slice(n, None)
+
+    def slice(self, n: int, m: Optional[int]) -> "AsyncPyFCollection[T]":
+        async def run():
+            if m is not None and m <= n:
+                return
+            i = 0
+            it = self._it.__aiter__()
+            try:
+                async for x in it:
+                    if i >= n:
+                        yield x
+                    i += 1
+                    if m is not None and i >= m:
+                        return
+            finally:
+                # Stop upstream straight away, instead of waiting for the garbage collector
+                if hasattr(it, "aclose"):
+                    await it.aclose()
+
+        return AsyncPyFCollection(run())
+
+    def grouped(self, n: int) -> "AsyncPyFCollection[tuple[T, ...]]":
+        if n < 1:
+            raise ValueError("n must be positive")
+
+        async def run():
+            batch: list = []
+            async for x in self._it:
+                batch.append(x)
+                if len(batch) == n:
+                    yield tuple(batch)
+                    batch.clear()
+            if batch:
+                yield tuple(batch)
+
+        return AsyncPyFCollection(run())
+
+    async def find(self, func: Callable[[T], bool]) -> Optional[T]:
+        async for e in self._it:
+            if func(e):
+                return e
+        return None
+
+    async def exist(self, func: Callable[[T], bool]) -> bool:
+        async for e in self._it:
+            if func(e):
+                return True
+        return False
+
+    async def fold(self, acc: U, func: Callable[[U, T], U]) -> U:
+        return await self.fold_left(acc, func)
+
+    async def fold_left(self, acc: U, func: Callable[[U, T], U]) -> U:
+        async for e in self._it:
+            acc = func(acc, e)
+        return acc
+
+    async def reduce(self, func: Callable[[T, T], T]) -> Optional[T]:
+        missing = object()
+        acc = missing
+        async for e in self._it:
+            acc = e if acc is missing else func(acc, e)
+        return None if acc is missing else acc
+
+    async def to_list(self) -> list[T]:
+        return [x async for x in self._it]
+
+
+# ----------------------------- Concurrent map -----------------------------
+
+async def _map_ordered(source: AsyncIterable[T], fn: Callable[[T], Awaitable[U]], concurrency: int) -> AsyncIterator[U]:
+    pending: deque = deque()
+    try:
+        async for x in source:
+            pending.append(asyncio.ensure_future(fn(x)))
+            if len(pending) >= concurrency:
+                # The head blocks the output, the rest keep running meanwhile
+                yield await pending.popleft()
+        while pending:
+            yield await pending.popleft()
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+async def _map_unordered(source: AsyncIterable[T], fn: Callable[[T], Awaitable[U]], concurrency: int) -> AsyncIterator[U]:
+    pending: set = set()
+    try:
+        async for x in source:
+            pending.add(asyncio.ensure_future(fn(x)))
+            if len(pending) >= concurrency:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    yield task.result()
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
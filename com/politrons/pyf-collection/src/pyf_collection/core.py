@@ -1,18 +1,736 @@
 from __future__ import annotations
 
-from collections.abc import Iterable
-from typing import TypeVar, Generic, Callable, Optional
+import copy
+import csv
+import functools
+import heapq
+import json
+import mmap
+import os
+import pickle
+import struct
+import tempfile
+import time
+import weakref
+from array import array
+from collections import deque
+from concurrent.futures import Executor
+from collections.abc import Iterable, Iterator
+from typing import TypeVar, Generic, Callable, Optional, NamedTuple
 from itertools import islice, chain
 
 # Define a generic type variable
 T = TypeVar("T")
 U = TypeVar("U")
+K = TypeVar("K")
+V = TypeVar("V")
+W = TypeVar("W")
+
+# ----------------------------- Storage -----------------------------
+
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _compact(items: list) -> "list | array":
+    """
+    Pack a fully materialized buffer into a contiguous array when every element
+    is a plain int (64-bit) or float, otherwise keep the list as it is.
+    """
+    if not items or isinstance(items, array):
+        return items
+    kind = type(items[0])
+    if kind is not int and kind is not float:
+        return items
+    if any(type(x) is not kind for x in items):
+        return items
+    if kind is int:
+        if min(items) < _INT64_MIN or max(items) > _INT64_MAX:
+            return items
+        return array("q", items)
+    return array("d", items)
+
+
+class _CachedSource(Generic[T]):
+    """
+    Re-iterable memo over a one-shot iterable.
+    Elements are pulled from upstream only once, on demand, so a short-circuit
+    terminal (find/exist/take) only materializes the prefix it needed and the
+    next terminal continues from there.
+    Up to `memory_limit` elements are kept in memory; with `spill_to_disk` the
+    rest are pickled into a temp file and streamed back on later iterations.
+    When a `typecode` is given the in memory part is an `array.array` from the start.
+    """
+
+    def __init__(
+            self,
+            source: Iterable[T],
+            spill_to_disk: bool = False,
+            memory_limit: int = 1_000_000,
+            typecode: Optional[str] = None
+    ) -> None:
+        self._upstream: Optional[Iterator[T]] = iter(source)
+        # With a known typecode elements are packed from the very first one
+        self._memory: "list | array" = [] if typecode is None else array(typecode)
+        self._spill_to_disk = spill_to_disk
+        self._memory_limit = memory_limit
+        self._file = None
+        self._spilled = 0
+        self._finalizer = None
+        self._released = False
+
+    def __iter__(self) -> Iterator[T]:
+        if self._released:
+            raise RuntimeError("the collection was unpersisted, its elements are gone")
+        i = 0
+        while True:
+            # 1) In memory prefix
+            while i < len(self._memory):
+                yield self._memory[i]
+                i += 1
+            # 2) Spilled segment, read back with our own handle
+            if i - len(self._memory) < self._spilled:
+                for e in self._read_spilled(i - len(self._memory)):
+                    i += 1
+                    yield e
+                continue
+            # 3) Pull a new element from upstream and memoize it
+            if self._upstream is None:
+                return
+            try:
+                e = next(self._upstream)
+            except StopIteration:
+                self._upstream = None
+                self._memory = _compact(self._memory)
+                return
+            self._store(e)
+            i += 1
+            yield e
+
+    def _store(self, e: T) -> None:
+        if self._spilled == 0 and (not self._spill_to_disk or len(self._memory) < self._memory_limit):
+            self._memory.append(e)
+            return
+        if self._file is None:
+            self._file = tempfile.NamedTemporaryFile(prefix="pyf-", suffix=".spill", delete=False)
+            self._finalizer = weakref.finalize(self, _remove_spill, self._file)
+        pickle.dump(e, self._file, protocol=pickle.HIGHEST_PROTOCOL)
+        self._spilled += 1
+
+    def _read_spilled(self, start: int) -> Iterator[T]:
+        self._file.flush()
+        count = self._spilled
+        with open(self._file.name, "rb") as f:
+            for n in range(count):
+                e = pickle.load(f)
+                if n >= start:
+                    yield e
+
+    def release(self) -> None:
+        self._released = True
+        self._upstream = None
+        self._memory = []
+        self._spilled = 0
+        if self._finalizer is not None:
+            self._finalizer()
+            self._file = None
+            self._finalizer = None
+
+
+def _remove_spill(file) -> None:
+    file.close()
+    try:
+        os.remove(file.name)
+    except OSError:
+        pass
+
+
+def _hash_table(pairs: Iterable[tuple[K, V]]) -> dict:
+    table: dict = {}
+    for k, v in pairs:
+        bucket = table.get(k)
+        if bucket is None:
+            table[k] = [v]
+        else:
+            bucket.append(v)
+    return table
+
+
+class _LazyTable:
+    # Hash table of the `other` side of a join, loaded on the first run and reused by the next ones,
+    # so a one-shot iterable joins the same way on every terminal operation
+    __slots__ = ("_pairs", "_table")
+
+    def __init__(self, pairs: Iterable) -> None:
+        self._pairs = pairs
+        self._table: Optional[dict] = None
+
+    def get(self) -> dict:
+        if self._table is None:
+            self._table = _hash_table(self._pairs)
+            self._pairs = None
+        return self._table
+
+
+_MAX_PENDING_CHUNKS = 32
+
+
+def _chunks(source: Iterable[T], size: int) -> Iterator[list[T]]:
+    it = iter(source)
+    while True:
+        chunk = list(islice(it, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def _fold_chunk(acc: U, func: Callable[[U, T], U], chunk: list[T]) -> U:
+    for e in chunk:
+        acc = func(acc, e)
+    return acc
+
+
+def _tree_combine(partials: list[U], comb_op: Callable[[U, U], U]) -> U:
+    # Merge neighbours level by level, keeping the original order of the chunks
+    while len(partials) > 1:
+        merged = [comb_op(partials[i], partials[i + 1]) for i in range(0, len(partials) - 1, 2)]
+        if len(partials) % 2:
+            merged.append(partials[-1])
+        partials = merged
+    return partials[0]
+
+
+# ----------------------------- External sort -----------------------------
+
+_SPILL_BATCH = 4_096  # elements pickled together, one pickle call per batch instead of per element
+_MAX_MERGE_FAN_IN = 64  # spilled runs merged at once, keeps open file descriptors bounded
+
+
+def _external_sort(source: Iterable[T], key: Optional[Callable], reverse: bool, memory_limit: int) -> Iterator[T]:
+    """
+    Sort in memory while the data fits in `memory_limit` elements, otherwise sort chunks of that
+    size, spill each one as a run to a temp file and k-way merge the runs lazily.
+    Stable, like `sorted`, because runs keep the source order and the merge prefers earlier runs on ties.
+    """
+    it = iter(source)
+    chunk = list(islice(it, memory_limit))
+    if len(chunk) < memory_limit:
+        chunk.sort(key=key, reverse=reverse)
+        yield from chunk
+        return
+    created: list[str] = []
+    try:
+        runs = []
+        while chunk:
+            chunk.sort(key=key, reverse=reverse)
+            runs.append(_write_run(chunk, created))
+            chunk = list(islice(it, memory_limit))
+        # Merge neighbour runs level by level, so ties keep their source order
+        while len(runs) > _MAX_MERGE_FAN_IN:
+            merged = []
+            for i in range(0, len(runs), _MAX_MERGE_FAN_IN):
+                group = runs[i:i + _MAX_MERGE_FAN_IN]
+                merged.append(_write_run(heapq.merge(*map(_read_run, group), key=key, reverse=reverse), created))
+                _remove_runs(group)
+            runs = merged
+        yield from heapq.merge(*map(_read_run, runs), key=key, reverse=reverse)
+    finally:
+        _remove_runs(created)
+
+
+def _write_run(items: Iterable[T], created: list[str]) -> str:
+    with tempfile.NamedTemporaryFile(prefix="pyf-sort-", suffix=".run", delete=False) as f:
+        created.append(f.name)
+        for batch in _chunks(items, _SPILL_BATCH):
+            pickle.dump(batch, f, protocol=pickle.HIGHEST_PROTOCOL)
+        return f.name
+
+
+def _read_run(path: str) -> Iterator[T]:
+    with open(path, "rb", buffering=_READ_BUFFER) as f:
+        while True:
+            try:
+                batch = pickle.load(f)
+            except EOFError:
+                return
+            yield from batch
+
+
+def _remove_runs(paths: list[str]) -> None:
+    for path in paths:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def _sort_within_chunks(source: Iterable[T], size: int, key: Optional[Callable], reverse: bool) -> Iterator[T]:
+    for chunk in _chunks(source, size):
+        chunk.sort(key=key, reverse=reverse)
+        yield from chunk
+
+
+# ----------------------------- Windows -----------------------------
+
+def _grouped(source: Iterable[T], n: int) -> Iterator[tuple[T, ...]]:
+    if n < 1:
+        raise ValueError("n must be positive")
+    it = iter(source)
+    while True:
+        group = tuple(islice(it, n))
+        if not group:
+            return
+        yield group
+
+
+def _sliding(source: Iterable[T], n: int, step: int) -> Iterator[tuple[T, ...]]:
+    if n < 1 or step < 1:
+        raise ValueError("n and step must be positive")
+    it = iter(source)
+    ring: deque = deque(islice(it, n), maxlen=n)
+    if not ring:
+        return
+    yield tuple(ring)
+    if len(ring) < n:
+        return
+    overlap = max(n - step, 0)
+    while True:
+        if step < n:
+            fresh = 0
+            for x in islice(it, step):
+                ring.append(x)
+                fresh += 1
+        else:
+            # Skip the gap between windows, then refill the ring from scratch
+            next(islice(it, step - n, step - n), None)
+            ring.clear()
+            ring.extend(islice(it, n))
+            fresh = len(ring)
+        if fresh == 0:
+            return
+        if fresh < min(step, n):
+            # Source ended: emit the trailing elements not covered yet by a full window
+            yield tuple(islice(ring, n - overlap - fresh if step < n else 0, None))
+            return
+        yield tuple(ring)
+
+
+def _batch_by_size(source: Iterable[T], size: Callable[[T], int], limit: int) -> Iterator[tuple[T, ...]]:
+    batch: list = []
+    total = 0
+    for x in source:
+        s = size(x)
+        if batch and total + s > limit:
+            yield tuple(batch)
+            batch.clear()
+            total = 0
+        batch.append(x)
+        total += s
+    if batch:
+        yield tuple(batch)
+
+
+def _window(source: Iterable[T], seconds: float, clock: Callable[[], float]) -> Iterator[tuple[T, ...]]:
+    batch: list = []
+    end = None
+    for x in source:
+        now = clock()
+        if end is None:
+            end = now + seconds
+        elif now >= end:
+            if batch:
+                yield tuple(batch)
+                batch.clear()
+            # Align to the window the element falls in, skipping the empty ones
+            end += seconds * ((now - end) // seconds + 1)
+        batch.append(x)
+    if batch:
+        yield tuple(batch)
+
+
+# ----------------------------- Sources -----------------------------
+
+_READ_BUFFER = 1 << 20  # 1 MiB per read syscall
+
+
+class _Reiterable(Generic[T]):
+    """
+    Source that builds a fresh iterator on every iteration, so a file backed collection
+    can be consumed by several terminal operations, each one streaming the file again.
+    """
+
+    def __init__(self, factory: Callable[[], Iterator[T]]) -> None:
+        self._factory = factory
+
+    def __iter__(self) -> Iterator[T]:
+        return self._factory()
+
+
+def _read_lines(path: str, encoding: str) -> Iterator[str]:
+    with open(path, "r", encoding=encoding, newline="", buffering=_READ_BUFFER) as f:
+        for line in f:
+            yield line.rstrip("\r\n")
+
+
+def _read_csv(path: str, encoding: str, delimiter: str, header: bool) -> Iterator:
+    with open(path, "r", encoding=encoding, newline="", buffering=_READ_BUFFER) as f:
+        yield from (csv.DictReader if header else csv.reader)(f, delimiter=delimiter)
+
+
+def _read_jsonl(path: str, encoding: str) -> Iterator:
+    loads = json.loads
+    with open(path, "r", encoding=encoding, buffering=_READ_BUFFER) as f:
+        for line in f:
+            if line.strip():
+                yield loads(line)
+
+
+def _read_records(path: str, record: struct.Struct, records_per_chunk: int) -> Iterator[tuple]:
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size % record.size:
+            raise ValueError(f"{path} size {size} is not a multiple of the record size {record.size}")
+        if size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            step = record.size * records_per_chunk
+            for offset in range(0, size, step):
+                # Only one chunk is alive at a time, the page cache does the rest
+                yield from record.iter_unpack(mm[offset:offset + step])
+
+
+def _sliceable(source: Iterable) -> bool:
+    return isinstance(source, (array, memoryview))
+
+
+# ----------------------------- Plan -----------------------------
+
+class _Stage(NamedTuple):
+    """One streaming step of the logical plan, see [PyFCollection.explain]."""
+    kind: str  # map | filter | flat_map | distinct | slice
+    fn: Optional[Callable] = None
+    pure: bool = False  # map only: no side effects
+    start: int = 0
+    stop: Optional[int] = None
+    value: object = None
+    commutes: bool = False  # filter only: same answer on the element before and after a map
+
+    def describe(self) -> str:
+        if self.kind == "slice":
+            return f"slice({self.start}, {self.stop})"
+        if self.kind == "distinct":
+            return f"distinct({self.value!r})"
+        flags = (", pure" if self.pure else "") + (", commutes_with_map" if self.commutes else "")
+        return f"{self.kind}({_name(self.fn)}{flags})"
+
+
+def _name(fn: Callable) -> str:
+    return getattr(fn, "__qualname__", None) or repr(fn)
+
+
+def _optimize(stages: tuple[_Stage, ...]) -> tuple[_Stage, ...]:
+    """
+    Rewrite rules, applied until nothing changes:
+        * commuting filter right after a pure map → filter first, the map only runs on kept elements
+        * slice right after a pure map            → slice first, the map only runs on the window
+        * slice right after a slice               → single slice
+    Both flags are promises made by the user: `pure` means no side effects, `commutes_with_map`
+    means the filter gives the same answer on the element before and after the map (e.g. the map
+    enriches a record and the filter checks a field the map does not touch).
+    """
+    plan = list(stages)
+    changed = True
+    while changed:
+        changed = False
+        for i in range(len(plan) - 1):
+            a, b = plan[i], plan[i + 1]
+            if a.kind == "map" and a.pure and b.kind == "filter" and b.commutes:
+                plan[i], plan[i + 1] = b, a
+            elif a.kind == "map" and a.pure and b.kind == "slice":
+                plan[i], plan[i + 1] = b, a
+            elif a.kind == "slice" and b.kind == "slice":
+                plan[i:i + 2] = [_merge_slices(a, b)]
+            else:
+                continue
+            changed = True
+            break
+    return tuple(plan)
+
+
+def _merge_slices(a: _Stage, b: _Stage) -> _Stage:
+    start = a.start + b.start
+    stops = [x for x in (a.stop, None if b.stop is None else a.start + b.stop) if x is not None]
+    stop = max(min(stops), start) if stops else None
+    return _Stage("slice", start=start, stop=stop)
+
+
+def _compile(source: Iterable, stages: tuple[_Stage, ...]) -> Iterable:
+    it = source
+    i = 0
+    # Leading slices over typed or range sources become views, nothing is iterated
+    while i < len(stages) and stages[i].kind == "slice" and (_sliceable(it) or isinstance(it, range)):
+        s = stages[i]
+        it = memoryview(it)[s.start:s.stop] if _sliceable(it) else it[s.start:s.stop]
+        i += 1
+    for s in stages[i:]:
+        if s.kind == "map":
+            it = map(s.fn, it)
+        elif s.kind == "filter":
+            it = filter(s.fn, it)
+        elif s.kind == "flat_map":
+            it = chain.from_iterable(map(s.fn, it))
+        elif s.kind == "distinct":
+            it = _without(it, s.value)
+        else:
+            it = islice(it, s.start, s.stop)
+    return it
+
+
+def _without(source: Iterable[T], value: T) -> Iterator[T]:
+    return (x for x in source if x != value)
+
+
+# ----------------------------- Profiling -----------------------------
+
+class _StageStats:
+    __slots__ = ("label", "inclusive", "calls", "out", "seconds")
+
+    def __init__(self, label: str, inclusive: bool) -> None:
+        self.label = label
+        self.inclusive = inclusive  # time measured around next(), so it includes the upstream stages
+        self.calls = 0
+        self.out = 0
+        self.seconds = 0.0
+
+
+class _Profiler:
+    """
+    Per-stage counters shared by every collection derived from a profiled one.
+    Rows are indexed by their position in the optimized plan, so the report reads like [explain].
+    """
+
+    def __init__(self, sink: Callable[[str], None]) -> None:
+        self._sink = sink
+        self._rows: dict[int, _StageStats] = {}
+
+    def row(self, index: int, label: str, inclusive: bool = False) -> _StageStats:
+        stats = self._rows.get(index)
+        if stats is None:
+            stats = self._rows[index] = _StageStats(label, inclusive)
+        return stats
+
+    def reset(self) -> None:
+        for stats in self._rows.values():
+            stats.calls = stats.out = 0
+            stats.seconds = 0.0
+
+    def report(self) -> str:
+        lines = [f"{'stage':<40} {'in':>10} {'out':>10} {'time ms':>10}"]
+        for _, r in sorted(self._rows.items()):
+            calls = "-" if r.inclusive else str(r.calls)
+            label = f"{r.label}*" if r.inclusive else r.label
+            lines.append(f"{label[:40]:<40} {calls:>10} {r.out:>10} {r.seconds * 1e3:>10.3f}")
+        lines.append("* time includes the upstream stages")
+        return "\n".join(lines)
+
+    def emit(self) -> None:
+        self._sink(self.report())
+
+
+def _compile_profiled(source: Iterable, stages: tuple[_Stage, ...], label: str, base: int,
+                      profiler: _Profiler) -> Iterable:
+    # No view shortcut for leading slices, so every stage gets its own row
+    it = _timed(source, profiler.row(base, label, inclusive=True))
+    for i, s in enumerate(stages, start=base + 1):
+        stats = profiler.row(i, s.describe())
+        if s.kind == "map":
+            it = _counted(map(_timed_call(s.fn, stats), it), stats)
+        elif s.kind == "filter":
+            it = _counted(filter(_timed_call(s.fn, stats), it), stats)
+        elif s.kind == "flat_map":
+            it = _counted(chain.from_iterable(map(_timed_call(s.fn, stats), it)), stats)
+        elif s.kind == "distinct":
+            it = _counted(_without(_calls(it, stats), s.value), stats)
+        else:
+            it = _counted(islice(_calls(it, stats), s.start, s.stop), stats)
+    return it
+
+
+def _timed_call(fn: Callable, stats: _StageStats) -> Callable:
+    clock = time.perf_counter
+
+    def timed(x):
+        start = clock()
+        try:
+            return fn(x)
+        finally:
+            stats.seconds += clock() - start
+            stats.calls += 1
+
+    return timed
+
+
+def _counted(source: Iterable[T], stats: _StageStats) -> Iterator[T]:
+    for x in source:
+        stats.out += 1
+        yield x
+
+
+def _calls(source: Iterable[T], stats: _StageStats) -> Iterator[T]:
+    for x in source:
+        stats.calls += 1
+        yield x
+
+
+def _timed(source: Iterable[T], stats: _StageStats) -> Iterator[T]:
+    clock = time.perf_counter
+    it = iter(source)
+    while True:
+        start = clock()
+        try:
+            x = next(it)
+        except StopIteration:
+            stats.seconds += clock() - start
+            return
+        stats.seconds += clock() - start
+        stats.out += 1
+        yield x
+
+
+def _terminal(method: Callable) -> Callable:
+    """
+    Mark a terminal operation: when the collection is profiled, counters are reset before it
+    runs and the per-stage report is emitted once it finishes. Unprofiled calls only pay one check.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        profiler = self._profiler
+        if profiler is None:
+            return method(self, *args, **kwargs)
+        profiler.reset()
+        try:
+            return method(self, *args, **kwargs)
+        finally:
+            profiler.emit()
+
+    return wrapper
+
+
+# ----------------------------- Collection -----------------------------
 
 class PyFCollection(Generic[T]):
     def __init__(self, source: Iterable[T]) -> None:
         # just remember the iterable, don't convert to list
-        self._it: Iterable[T] = source
-        self._acc = None
+        self._source: Iterable[T] = source
+        # Streaming steps since the last source/barrier, compiled on each terminal operation
+        self._stages: tuple[_Stage, ...] = ()
+        # (parent, label) when this collection is the output of a barrier operation like group_by
+        self._origin: Optional[tuple[PyFCollection, str]] = None
+        self._profiler: Optional[_Profiler] = None
+        # Memo this collection reads from, set by [persist] and kept by the streaming steps after it
+        self._cached: Optional[_CachedSource] = None
+
+    @property
+    def _it(self) -> Iterable[T]:
+        if self._profiler is not None:
+            return _compile_profiled(self._source, _optimize(self._stages), self._source_label(),
+                                     self._base(), self._profiler)
+        if not self._stages:
+            return self._source
+        return _compile(self._source, _optimize(self._stages))
+
+    def _then(self, stage: _Stage) -> "PyFCollection":
+        out = PyFCollection(self._source)
+        out._stages = self._stages + (stage,)
+        out._origin = self._origin
+        out._profiler = self._profiler
+        out._cached = self._cached
+        return out
+
+    def _derive(self, source: Iterable[U], label: str) -> "PyFCollection[U]":
+        out = PyFCollection(source)
+        out._origin = (self, label)
+        out._profiler = self._profiler
+        return out
+
+    def _source_label(self) -> str:
+        return f"source({type(self._source).__name__})" if self._origin is None else self._origin[1]
+
+    def _base(self) -> int:
+        # Position of this collection's source line in the optimized plan
+        if self._origin is None:
+            return 0
+        parent = self._origin[0]
+        return parent._base() + 1 + len(_optimize(parent._stages))
+
+    def profile(self, sink: Callable[[str], None] = print) -> "PyFCollection[T]":
+        """
+        Opt-in profiling of every following step: elements in/out and time spent per stage,
+        reported to `sink` at the end of each terminal operation. Call it right after the source
+        to profile the whole pipeline.
+        """
+        out = PyFCollection(self._source)
+        out._stages = self._stages
+        out._origin = self._origin
+        out._profiler = _Profiler(sink)
+        out._cached = self._cached
+        return out
+
+    def explain(self) -> str:
+        """
+        Render the logical plan as written by the user and the optimized plan that will run.
+        Barrier operations (group_by, sort_by, cache...) are shown as the source of the steps after them.
+        """
+        return "\n".join(["== Logical plan ==", *self._describe(False),
+                          "== Optimized plan ==", *self._describe(True)])
+
+    def _describe(self, optimized: bool) -> list[str]:
+        if self._origin is None:
+            lines = [f"source({type(self._source).__name__})"]
+        else:
+            parent, label = self._origin
+            lines = parent._describe(optimized) + [label]
+        stages = _optimize(self._stages) if optimized else self._stages
+        return lines + [s.describe() for s in stages]
+
+    @staticmethod
+    def from_array(typecode: str, values: Iterable) -> "PyFCollection":
+        # Typed collection over a contiguous `array.array`, 8 bytes per 'q'/'d' element instead of a boxed object
+        return PyFCollection(array(typecode, values))
+
+    @staticmethod
+    def from_buffer(buffer, typecode: Optional[str] = None) -> "PyFCollection":
+        """
+        Zero-copy collection over any object supporting the buffer protocol (array, bytes, mmap, numpy...).
+        A `typecode` reinterprets the raw bytes, e.g. `from_buffer(payload, "d")` for packed doubles.
+        """
+        view = memoryview(buffer)
+        if typecode is not None and view.format != typecode:
+            view = view.cast("B").cast(typecode)
+        return PyFCollection(view)
+
+    @staticmethod
+    def from_lines(path: str, encoding: str = "utf-8") -> "PyFCollection[str]":
+        # Lazily stream the lines of a text file, without the trailing newline
+        return PyFCollection(_Reiterable(lambda: _read_lines(path, encoding)))
+
+    @staticmethod
+    def from_csv(path: str, delimiter: str = ",", header: bool = False, encoding: str = "utf-8") -> "PyFCollection":
+        # Rows as lists of strings, or as dicts keyed by column name when the file has a header
+        return PyFCollection(_Reiterable(lambda: _read_csv(path, encoding, delimiter, header)))
+
+    @staticmethod
+    def from_jsonl(path: str, encoding: str = "utf-8") -> "PyFCollection":
+        # One JSON document per line, blank lines are skipped
+        return PyFCollection(_Reiterable(lambda: _read_jsonl(path, encoding)))
+
+    @staticmethod
+    def from_binary_records(path: str, struct_fmt: str, records_per_chunk: int = 65_536) -> "PyFCollection[tuple]":
+        """
+        Fixed size binary records, decoded with `struct_fmt` (see the `struct` module) from a
+        memory mapped file, `records_per_chunk` at a time.
+        """
+        record = struct.Struct(struct_fmt)
+        return PyFCollection(_Reiterable(lambda: _read_records(path, record, records_per_chunk)))
 
     def __iter__(self):
         return iter(self._it)
@@ -20,27 +738,31 @@ class PyFCollection(Generic[T]):
     def __repr__(self) -> str:  # zero side-effects
         return f"<PyFCollection at 0x{id(self):x}>"
 
-    def map(self, fn: Callable[[T], U]) -> "PyFCollection[U]":
-        return PyFCollection(fn(x) for x in self._it)
+    def map(self, fn: Callable[[T], U], pure: bool = False) -> "PyFCollection[U]":
+        # pure=True lets the optimizer move filters and limits ahead of this map
+        return self._then(_Stage("map", fn, pure))
 
-    def filter(self, pred: Callable[[T], bool]) -> "PyFCollection[T]":
-        return PyFCollection(x for x in self._it if pred(x))
+    def filter(self, pred: Callable[[T], bool], commutes_with_map: bool = False) -> "PyFCollection[T]":
+        # commutes_with_map=True lets the optimizer run this filter before a preceding pure map
+        return self._then(_Stage("filter", pred, commutes=commutes_with_map))
 
     def flat_map(self, fn: Callable[[T], Iterable[U]]) -> "PyFCollection[U]":
-        return PyFCollection(chain.from_iterable(fn(x) for x in self._it))
+        return self._then(_Stage("flat_map", fn))
 
     def distinct(self, value: T) -> "PyFCollection[T]":
-        return PyFCollection(x for x in self._it if x != value)
+        return self._then(_Stage("distinct", value=value))
 
     def take(self, n: int) -> "PyFCollection[T]":
-        return PyFCollection(islice(self._it, n))
+        return self.slice(0, n)
 
+    @_terminal
     def find(self, func: Callable[[T], bool]) -> "Optional[U]":
         for e in self._it:
             if func(e):
                 return e
         return None
 
+    @_terminal
     def exist(self, func: Callable[[T], bool]) -> bool:
         for e in self._it:
             if func(e):
@@ -48,19 +770,242 @@ class PyFCollection(Generic[T]):
         return False
 
     def fold(self, acc: U, func: Callable[[U, T], U]) -> U:
-        self._acc = acc
+        return self.fold_left(acc, func)
+
+    @_terminal
+    def fold_left(self, acc: U, func: Callable[[U, T], U]) -> U:
         for e in self._it:
-            acc = acc + func(self._acc, e)
+            acc = func(acc, e)
+        return acc
+
+    @_terminal
+    def reduce(self, func: Callable[[T, T], T]) -> "Optional[T]":
+        # Left fold seeded with the first element, None when the collection is empty
+        it = iter(self._it)
+        missing = object()
+        acc = next(it, missing)
+        if acc is missing:
+            return None
+        for e in it:
+            acc = func(acc, e)
         return acc
 
+    @_terminal
+    def aggregate(
+            self,
+            zero: U,
+            seq_op: Callable[[U, T], U],
+            comb_op: Callable[[U, U], U],
+            chunk_size: int = 10_000,
+            executor: Optional[Executor] = None
+    ) -> U:
+        """
+        Fold every chunk of `chunk_size` elements with `seq_op` starting from a copy of `zero`,
+        then merge the partial results pairwise with `comb_op`, which must be associative.
+        When an `executor` is provided the chunks are folded on it, with a bounded number in flight.
+        """
+        chunks = _chunks(self._it, chunk_size)
+        if executor is None:
+            partials = [_fold_chunk(copy.deepcopy(zero), seq_op, chunk) for chunk in chunks]
+        else:
+            partials = []
+            pending: deque = deque()
+            for chunk in chunks:
+                pending.append(executor.submit(_fold_chunk, copy.deepcopy(zero), seq_op, chunk))
+                if len(pending) >= _MAX_PENDING_CHUNKS:
+                    partials.append(pending.popleft().result())
+            partials.extend(f.result() for f in pending)
+        if not partials:
+            return zero
+        return _tree_combine(partials, comb_op)
+
     def drop(self, n: int) -> "PyFCollection[T]":
-        return PyFCollection(self._it[n:])
+        return self.slice(n, None)
+
+    def slice(self, n: int, m: Optional[int]) -> "PyFCollection[T]":
+        if n < 0 or (m is not None and m < 0):
+            raise ValueError("slice indices must be non negative")
+        return self._then(_Stage("slice", start=n, stop=m))
+
+    def group_by(self, key: Callable[[T], K]) -> "PyFCollection[tuple[K, list[T]]]":
+        # One pass over the source into a hash table, on every terminal operation of the result
+        return self._derive(_Reiterable(lambda: iter(_hash_table((key(x), x) for x in self._it).items())),
+                            f"group_by({_name(key)})")
+
+    def reduce_by_key(self: "PyFCollection[tuple[K, V]]", func: Callable[[V, V], V]) -> "PyFCollection[tuple[K, V]]":
+        # Combine values of (key, value) pairs in place, without keeping the groups around
+        def run():
+            acc: dict = {}
+            missing = object()
+            for k, v in self._it:
+                prev = acc.get(k, missing)
+                acc[k] = v if prev is missing else func(prev, v)
+            yield from acc.items()
+
+        return self._derive(_Reiterable(run), f"reduce_by_key({_name(func)})")
+
+    def count_by(self, key: Callable[[T], K]) -> "PyFCollection[tuple[K, int]]":
+        def run():
+            counts: dict = {}
+            for x in self._it:
+                k = key(x)
+                counts[k] = counts.get(k, 0) + 1
+            yield from counts.items()
 
-    def slice(self, n: int, m: int) -> "PyFCollection[U]":
-        return PyFCollection(self._it[n:m])
+        return self._derive(_Reiterable(run), f"count_by({_name(key)})")
 
+    def join(self: "PyFCollection[tuple[K, V]]", other: Iterable[tuple[K, W]]) -> "PyFCollection[tuple[K, tuple[V, W]]]":
+        """
+        Inner hash join of (key, value) pairs. The `other` side is loaded into a hash table,
+        this side is streamed, so put the bigger dataset on the left.
+        """
+        table = _LazyTable(other)
+
+        def run():
+            matches = table.get()
+            for k, v in self._it:
+                for w in matches.get(k, ()):
+                    yield k, (v, w)
+
+        return self._derive(_Reiterable(run), "join(hash)")
+
+    def left_join(self: "PyFCollection[tuple[K, V]]", other: Iterable[tuple[K, W]]) -> "PyFCollection[tuple[K, tuple[V, Optional[W]]]]":
+        # Same as [join], but keys without a match on `other` are kept with None
+        table = _LazyTable(other)
+
+        def run():
+            loaded = table.get()
+            for k, v in self._it:
+                matches = loaded.get(k)
+                if matches is None:
+                    yield k, (v, None)
+                else:
+                    for w in matches:
+                        yield k, (v, w)
+
+        return self._derive(_Reiterable(run), "left_join(hash)")
+
+    def sort_by(self, key: Callable[[T], object], reverse: bool = False) -> "PyFCollection[T]":
+        return self.sorted(key, reverse)
+
+    def sorted(
+            self,
+            key: Optional[Callable[[T], object]] = None,
+            reverse: bool = False,
+            memory_limit: int = 1_000_000
+    ) -> "PyFCollection[T]":
+        """
+        Stable sort holding at most `memory_limit` elements in memory. Bigger inputs are sorted
+        in runs spilled to temp files, which are merged lazily while the result is consumed.
+        """
+        if memory_limit < 1:
+            raise ValueError("memory_limit must be positive")
+        return self._derive(_Reiterable(lambda: _external_sort(self._it, key, reverse, memory_limit)),
+                            f"sorted({_name(key) if key else ''})")
+
+    def sort_within_chunks(
+            self,
+            chunk_size: int,
+            key: Optional[Callable[[T], object]] = None,
+            reverse: bool = False
+    ) -> "PyFCollection[T]":
+        # Each chunk of `chunk_size` consecutive elements is sorted on its own, in constant memory
+        return self._derive(_Reiterable(lambda: _sort_within_chunks(self._it, chunk_size, key, reverse)),
+                            f"sort_within_chunks({chunk_size})")
+
+    def top_k(self, k: int, key: Optional[Callable[[T], object]] = None) -> "PyFCollection[T]":
+        # Bounded heap of size k, so memory is O(k) whatever the size of the source
+        return self._derive(_Reiterable(lambda: iter(heapq.nlargest(k, self._it, key=key))), f"top_k({k})")
+
+    def grouped(self, n: int) -> "PyFCollection[tuple[T, ...]]":
+        # Consecutive chunks of n elements, the last one may be shorter
+        return self._derive(_Reiterable(lambda: _grouped(self._it, n)), f"grouped({n})")
+
+    def sliding(self, n: int, step: int = 1) -> "PyFCollection[tuple[T, ...]]":
+        # Windows of n elements every `step` elements, backed by a single ring buffer
+        return self._derive(_Reiterable(lambda: _sliding(self._it, n, step)), f"sliding({n}, {step})")
+
+    def batch_by_size(self, size: Callable[[T], int], limit: int) -> "PyFCollection[tuple[T, ...]]":
+        """
+        Batches whose total `size` (e.g. bytes) does not exceed `limit`.
+        An element bigger than `limit` on its own is emitted as a single element batch.
+        """
+        return self._derive(_Reiterable(lambda: _batch_by_size(self._it, size, limit)),
+                            f"batch_by_size({_name(size)}, {limit})")
+
+    def window(self, seconds: float, clock: Callable[[], float] = time.monotonic) -> "PyFCollection[tuple[T, ...]]":
+        """
+        Tumbling time windows: elements pulled within the same `seconds` interval are emitted together.
+        A window is closed when the first element of the next one arrives, or when the source ends.
+        """
+        return self._derive(_Reiterable(lambda: _window(self._it, seconds, clock)), f"window({seconds}s)")
+
+    def cache(self, typecode: Optional[str] = None) -> "PyFCollection[T]":
+        """
+        Memoize the pipeline in memory, so it can be consumed by several terminal operations
+        without recomputing upstream steps. Primitive results are packed into `array.array`,
+        straight away when the `typecode` is known, otherwise once fully consumed.
+        """
+        return self.persist(typecode=typecode)
+
+    def persist(
+            self,
+            spill_to_disk: bool = False,
+            memory_limit: int = 1_000_000,
+            typecode: Optional[str] = None
+    ) -> "PyFCollection[T]":
+        """
+        Like [cache], but once `memory_limit` elements are held in memory the rest
+        are spilled to a temporary file when `spill_to_disk` is enabled.
+        """
+        # Checked on the attribute: a profiled collection compiles to a timing wrapper, not the memo itself
+        if self._cached is not None and not self._stages:
+            return self
+        it = self._it
+        if _sliceable(it):
+            return self
+        out = self._derive(_CachedSource(it, spill_to_disk, memory_limit, typecode), "persist")
+        out._cached = out._source
+        return out
+
+    def unpersist(self) -> "PyFCollection[T]":
+        # Free memoized data and remove any spill file, also from a step after the persist.
+        # The elements are not recomputed: a later terminal operation raises RuntimeError
+        if self._cached is not None:
+            self._cached.release()
+        return self
+
+    @_terminal
     def to_list(self) -> list[T]:
-        return list(self._it)
+        it = self._it
+        if _sliceable(it):
+            return it.tolist()
+        return list(it)
+
+    @_terminal
+    def to_array(self, typecode: str) -> array:
+        # Contiguous copy, a memcpy when the source is already typed with the same typecode
+        it = self._it
+        if _sliceable(it) and memoryview(it).format == typecode:
+            return array(typecode, memoryview(it).tobytes())
+        return array(typecode, it)
 
+    @_terminal
+    def to_numpy(self, dtype=None):
+        """
+        Materialize as a numpy array. Typed sources are exposed through the buffer protocol
+        without copying, anything else goes through `numpy.fromiter`.
+        numpy is an optional dependency, only imported when this method is called.
+        """
+        try:
+            import numpy as np
+        except ImportError as ex:
+            raise ImportError("to_numpy requires numpy, install it with `pip install numpy`") from ex
+        it = self._it
+        if _sliceable(it):
+            return np.asarray(memoryview(it), dtype=dtype)
+        if dtype is not None:
+            return np.fromiter(it, dtype=dtype)
+        return np.array(list(it))
 
 
@@ -1,59 +1,433 @@
 """
-benchmark_pyf_vs_vanilla.py
-───────────────────────────
-Tiny benchmark: PyFCollection vs. plain-Python comprehensions.
-
-Dataset: 1 000 000 integers
-Pipeline:
-    1. map        → double each value
-    2. filter     → keep multiples of 3
-    3. flat_map   → produce (n, -n) for each element
-    4. distinct   → drop a single value (-6) so the op does something
-    5. take       → keep first 100 items
-    6. to_list    → materialise the final result
-
-We use timeit (5 runs) for a rough comparison.
+core_perf_test.py
+─────────────────
+Benchmark suite: PyFCollection vs. vanilla Python vs. itertools.
+
+Every case runs against three source shapes (list, generator, range) and is measured twice:
+    1. time       → best and mean of `--repeat` runs (perf_counter, one call per run)
+    2. memory     → peak traced allocation of one run (tracemalloc)
+
+Cases cover
+    * each collection operator on its own (the file sources and array/numpy exports are not covered)
+    * pipeline depth (1, 2, 4, 8 and 16 chained maps)
+    * early-exit terminals (take/find) vs. full consumption (to_list/fold)
+    * the original map → filter → flat_map → distinct → take pipeline
+
+Results are printed as a table and can be written as JSON with `--json out.json`.
+Passing `--baseline previous.json` compares against a previous run and exits with 1
+when any PyFCollection case is slower than `--threshold` times its baseline.
+
+    PYTHONPATH=src python src/test/core_perf_test.py --size 100000 --json bench.json
 """
 
-from timeit import timeit
-from typing import List
+from __future__ import annotations
+
+import argparse
+import heapq
+import json
+import sys
+import tracemalloc
+from collections import Counter, defaultdict
+from dataclasses import dataclass, asdict
+from functools import reduce
+from itertools import islice, chain, count, groupby
+from operator import add
+from time import perf_counter
+from typing import Callable, Iterable, Optional
 
-# ---- import your collection implementation -------------------------
 from pyf_collection import PyFCollection
 
+SOURCES: dict[str, Callable[[int], Iterable[int]]] = {
+    "list": lambda n: list(range(n)),
+    "generator": lambda n: (x for x in range(n)),
+    "range": lambda n: range(n),
+}
+
+
+@dataclass
+class Case:
+    name: str
+    terminal: str  # "early" exit or "full" consumption
+    impls: dict[str, Callable[[Iterable[int]], object]]
+
+
+@dataclass
+class Result:
+    case: str
+    impl: str
+    source: str
+    terminal: str
+    size: int
+    best_s: float
+    mean_s: float
+    peak_bytes: int
+
+
+# ----------------------------- Cases -----------------------------
+
+def _vanilla_pipeline(src: Iterable[int]) -> list[int]:
+    doubled = (x * 2 for x in src)
+    multiples = (x for x in doubled if x % 3 == 0)
+    flatmapped = (y for x in multiples for y in (x, -x))
+    distincted = (x for x in flatmapped if x != -6)
+    return [x for _, x in zip(range(100), distincted)]
+
+
+def _itertools_pipeline(src: Iterable[int]) -> list[int]:
+    doubled = map((2).__mul__, src)
+    multiples = filter(lambda x: x % 3 == 0, doubled)
+    flatmapped = chain.from_iterable(map(lambda x: (x, -x), multiples))
+    distincted = filter((-6).__ne__, flatmapped)
+    return list(islice(distincted, 100))
+
+
+def _depth_case(depth: int) -> Case:
+    def pyf(src):
+        c = PyFCollection(src)
+        for _ in range(depth):
+            c = c.map(lambda x: x + 1)
+        return c.to_list()
+
+    def vanilla(src):
+        it = src
+        for _ in range(depth):
+            it = (x + 1 for x in it)
+        return list(it)
+
+    def itertools_(src):
+        it = src
+        for _ in range(depth):
+            it = map((1).__add__, it)
+        return list(it)
+
+    return Case(f"depth[{depth}]", "full", {"pyf": pyf, "vanilla": vanilla, "itertools": itertools_})
+
+
+def build_cases() -> list[Case]:
+    square = lambda x: x * x
+    even = lambda x: x % 2 == 0
+    cases = [
+        Case("map", "full", {
+            "pyf": lambda s: PyFCollection(s).map(square).to_list(),
+            "vanilla": lambda s: [square(x) for x in s],
+            "itertools": lambda s: list(map(square, s)),
+        }),
+        Case("filter", "full", {
+            "pyf": lambda s: PyFCollection(s).filter(even).to_list(),
+            "vanilla": lambda s: [x for x in s if even(x)],
+            "itertools": lambda s: list(filter(even, s)),
+        }),
+        Case("flat_map", "full", {
+            "pyf": lambda s: PyFCollection(s).flat_map(lambda x: (x, -x)).to_list(),
+            "vanilla": lambda s: [y for x in s for y in (x, -x)],
+            "itertools": lambda s: list(chain.from_iterable(map(lambda x: (x, -x), s))),
+        }),
+        Case("distinct", "full", {
+            "pyf": lambda s: PyFCollection(s).distinct(7).to_list(),
+            "vanilla": lambda s: [x for x in s if x != 7],
+            "itertools": lambda s: list(filter((7).__ne__, s)),
+        }),
+        Case("take", "early", {
+            "pyf": lambda s: PyFCollection(s).take(100).to_list(),
+            "vanilla": lambda s: [x for _, x in zip(range(100), s)],
+            "itertools": lambda s: list(islice(s, 100)),
+        }),
+        Case("drop", "full", {
+            "pyf": lambda s: PyFCollection(s).drop(100).to_list(),
+            "vanilla": lambda s: [x for i, x in enumerate(s) if i >= 100],
+            "itertools": lambda s: list(islice(s, 100, None)),
+        }),
+        Case("slice", "early", {
+            "pyf": lambda s: PyFCollection(s).slice(100, 200).to_list(),
+            "vanilla": lambda s: [x for i, x in zip(range(200), s) if i >= 100],
+            "itertools": lambda s: list(islice(s, 100, 200)),
+        }),
+        Case("find", "early", {
+            "pyf": lambda s: PyFCollection(s).find(lambda x: x == 1_000),
+            "vanilla": lambda s: next((x for x in s if x == 1_000), None),
+            "itertools": lambda s: next(filter((1_000).__eq__, s), None),
+        }),
+        Case("exist", "full", {
+            "pyf": lambda s: PyFCollection(s).exist(lambda x: x < 0),
+            "vanilla": lambda s: any(x < 0 for x in s),
+        }),
+        Case("fold_left", "full", {
+            "pyf": lambda s: PyFCollection(s).fold_left(0, add),
+            "vanilla": lambda s: sum(s),
+            "itertools": lambda s: reduce(add, s, 0),
+        }),
+        Case("reduce", "full", {
+            "pyf": lambda s: PyFCollection(s).reduce(add),
+            "itertools": lambda s: reduce(add, s),
+        }),
+        Case("aggregate", "full", {
+            "pyf": lambda s: PyFCollection(s).aggregate(0, add, add),
+            "vanilla": lambda s: sum(s),
+        }),
+        Case("group_by", "full", {
+            "pyf": lambda s: PyFCollection(s).group_by(lambda x: x % 10).to_list(),
+            "vanilla": lambda s: _vanilla_group_by(s, lambda x: x % 10),
+        }),
+        Case("count_by", "full", {
+            "pyf": lambda s: PyFCollection(s).count_by(lambda x: x % 10).to_list(),
+            "vanilla": lambda s: list(Counter(x % 10 for x in s).items()),
+        }),
+        Case("reduce_by_key", "full", {
+            "pyf": lambda s: PyFCollection(s).map(lambda x: (x % 10, x)).reduce_by_key(add).to_list(),
+            "vanilla": lambda s: _vanilla_reduce_by_key((x % 10, x) for x in s),
+        }),
+        Case("join", "full", {
+            "pyf": lambda s: PyFCollection(s).map(lambda x: (x % 100, x)).join((k, k) for k in range(50)).to_list(),
+            "vanilla": lambda s: _vanilla_join(((x % 100, x) for x in s), ((k, k) for k in range(50))),
+        }),
+        Case("left_join", "full", {
+            "pyf": lambda s: PyFCollection(s).map(lambda x: (x % 100, x)).left_join((k, k) for k in range(50)).to_list(),
+            "vanilla": lambda s: _vanilla_left_join(((x % 100, x) for x in s), ((k, k) for k in range(50))),
+        }),
+        Case("sort_by", "full", {
+            "pyf": lambda s: PyFCollection(s).sort_by(lambda x: -x).to_list(),
+            "vanilla": lambda s: sorted(s, key=lambda x: -x),
+        }),
+        Case("sorted[spill]", "full", {
+            "pyf": lambda s: PyFCollection(s).sorted(key=lambda x: -x, memory_limit=10_000).to_list(),
+            "vanilla": lambda s: sorted(s, key=lambda x: -x),
+        }),
+        Case("sort_within_chunks", "full", {
+            "pyf": lambda s: PyFCollection(s).sort_within_chunks(1_000, key=lambda x: -x).to_list(),
+            "vanilla": lambda s: _vanilla_sort_within_chunks(s, 1_000, lambda x: -x),
+        }),
+        Case("top_k", "full", {
+            "pyf": lambda s: PyFCollection(s).top_k(10).to_list(),
+            "vanilla": lambda s: sorted(s, reverse=True)[:10],
+            "itertools": lambda s: heapq.nlargest(10, s),
+        }),
+        Case("grouped", "full", {
+            "pyf": lambda s: PyFCollection(s).grouped(100).to_list(),
+            "vanilla": lambda s: _vanilla_grouped(s, 100),
+            "itertools": lambda s: list(iter(lambda it=iter(s): tuple(islice(it, 100)), ())),
+        }),
+        Case("sliding", "full", {
+            "pyf": lambda s: PyFCollection(s).sliding(3).to_list(),
+            "vanilla": lambda s: _vanilla_sliding(list(s), 3),
+        }),
+        Case("batch_by_size", "full", {
+            "pyf": lambda s: PyFCollection(s).batch_by_size(_weight, 100).to_list(),
+            "vanilla": lambda s: _vanilla_batch_by_size(s, _weight, 100),
+        }),
+        Case("window", "full", {
+            # A fake clock advancing 1ms per element, so every run emits the same windows of 1000
+            "pyf": lambda s: PyFCollection(s).window(1.0, clock=_ticks()).to_list(),
+            "vanilla": lambda s: _vanilla_window(s, 1.0, _ticks()),
+            "itertools": lambda s: [tuple(g) for _, g in groupby(s, key=lambda _, clock=_ticks(): clock() // 1.0)],
+        }),
+        Case("cache+2 terminals", "full", {
+            "pyf": lambda s: _pyf_cached_twice(s),
+            "vanilla": lambda s: _vanilla_cached_twice(s),
+        }),
+        Case("persist[spill]+2x", "full", {
+            "pyf": lambda s: _pyf_spilled_twice(s),
+            "vanilla": lambda s: _vanilla_cached_twice(s),
+        }),
+        Case("pipeline", "early", {
+            "pyf": lambda s: (PyFCollection(s)
+                              .map(lambda x: x * 2)
+                              .filter(lambda x: x % 3 == 0)
+                              .flat_map(lambda x: (x, -x))
+                              .distinct(-6)
+                              .take(100)
+                              .to_list()),
+            "vanilla": _vanilla_pipeline,
+            "itertools": _itertools_pipeline,
+        }),
+    ]
+    cases.extend(_depth_case(d) for d in (1, 2, 4, 8, 16))
+    return cases
+
+
+def _vanilla_group_by(src, key):
+    groups = defaultdict(list)
+    for x in src:
+        groups[key(x)].append(x)
+    return list(groups.items())
+
+
+def _vanilla_reduce_by_key(pairs):
+    acc = {}
+    for k, v in pairs:
+        acc[k] = acc[k] + v if k in acc else v
+    return list(acc.items())
+
+
+def _vanilla_join(left, right):
+    table = defaultdict(list)
+    for k, w in right:
+        table[k].append(w)
+    return [(k, (v, w)) for k, v in left for w in table.get(k, ())]
+
+
+def _vanilla_left_join(left, right):
+    table = defaultdict(list)
+    for k, w in right:
+        table[k].append(w)
+    return [(k, (v, w)) for k, v in left for w in table.get(k, (None,))]
 
-# ---------- pipeline using PyFCollection ----------------------------
-def pipeline_pyf() -> List[int]:
-    data = list(range(1, 1_000_001))
 
-    result = (
-        PyFCollection(data)
-        .map(lambda x: x * 2)
-        .filter(lambda x: x % 3 == 0)
-        .flat_map(lambda x: PyFCollection([x, -x]))
-        .distinct(-6)
-        .take(100)
-        .to_list()
-    )
-    return result
+def _vanilla_sort_within_chunks(src, n, key):
+    it = iter(src)
+    out = []
+    while chunk := list(islice(it, n)):
+        out.extend(sorted(chunk, key=key))
+    return out
 
 
-# ---------- pipeline with “vanilla” Python --------------------------
-def pipeline_vanilla() -> List[int]:
-    data = list(range(1, 1_000_001))
+def _weight(x: int) -> int:
+    return x % 7 + 1
 
-    doubled     = (x * 2 for x in data)                       # map
-    multiples   = (x for x in doubled if x % 3 == 0)          # filter
-    flatmapped  = (y for x in multiples for y in (x, -x))     # flat-map
-    distincted  = (x for x in flatmapped if x != -6)          # distinct
-    first_100   = [x for _, x in zip(range(100), distincted)] # take
-    return first_100
+
+def _vanilla_batch_by_size(src, size, limit):
+    out, batch, total = [], [], 0
+    for x in src:
+        s = size(x)
+        if batch and total + s > limit:
+            out.append(tuple(batch))
+            batch, total = [], 0
+        batch.append(x)
+        total += s
+    if batch:
+        out.append(tuple(batch))
+    return out
+
+
+def _ticks() -> Callable[[], float]:
+    return map((0.001).__mul__, count()).__next__
+
+
+def _vanilla_window(src, seconds, clock):
+    out, batch, end = [], [], None
+    for x in src:
+        now = clock()
+        if end is None:
+            end = now + seconds
+        elif now >= end:
+            out.append(tuple(batch))
+            batch = []
+            end += seconds * ((now - end) // seconds + 1)
+        batch.append(x)
+    if batch:
+        out.append(tuple(batch))
+    return out
+
+
+def _vanilla_grouped(src, n):
+    out, batch = [], []
+    for x in src:
+        batch.append(x)
+        if len(batch) == n:
+            out.append(tuple(batch))
+            batch = []
+    if batch:
+        out.append(tuple(batch))
+    return out
+
+
+def _vanilla_sliding(items, n):
+    return [tuple(items[i:i + n]) for i in range(max(len(items) - n + 1, 1))]
+
+
+def _pyf_cached_twice(src):
+    cached = PyFCollection(x * 2 for x in src).cache()
+    return cached.exist(lambda x: x == 10), cached.to_list()
+
+
+def _pyf_spilled_twice(src):
+    persisted = PyFCollection(x * 2 for x in src).persist(spill_to_disk=True, memory_limit=10_000)
+    out = persisted.exist(lambda x: x == 10), persisted.to_list()
+    persisted.unpersist()
+    return out
+
+
+def _vanilla_cached_twice(src):
+    items = [x * 2 for x in src]
+    return 10 in items, items
+
+
+# ----------------------------- Runner -----------------------------
+
+def measure(case: Case, impl: str, source: str, size: int, runs: int) -> Result:
+    fn = case.impls[impl]
+    make = SOURCES[source]
+    times = _timed_runs(fn, make, size, runs)
+    # Built before tracing starts, so a list source is not counted in the peak
+    src = make(size)
+    tracemalloc.start()
+    fn(src)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(case.name, impl, source, case.terminal, size, min(times), sum(times) / len(times), peak)
+
+
+def _timed_runs(fn: Callable, make: Callable[[int], Iterable[int]], size: int, runs: int) -> list[float]:
+    times = []
+    for _ in range(runs):
+        # The source is rebuilt outside of the timed call, generators are single-shot
+        src = make(size)
+        start = perf_counter()
+        fn(src)
+        times.append(perf_counter() - start)
+    return times
+
+
+def run_suite(size: int, runs: int, only: Optional[str] = None) -> list[Result]:
+    results = []
+    for case in build_cases():
+        if only and only not in case.name:
+            continue
+        for source in SOURCES:
+            for impl in case.impls:
+                results.append(measure(case, impl, source, size, runs))
+    return results
+
+
+def print_table(results: list[Result]) -> None:
+    print(f"{'case':<20} {'terminal':<8} {'source':<10} {'impl':<10} {'best ms':>10} {'mean ms':>10} {'peak KiB':>10}")
+    for r in results:
+        print(f"{r.case:<20} {r.terminal:<8} {r.source:<10} {r.impl:<10} "
+              f"{r.best_s * 1e3:>10.3f} {r.mean_s * 1e3:>10.3f} {r.peak_bytes / 1024:>10.1f}")
+
+
+def regressions(results: list[Result], baseline: list[dict], threshold: float) -> list[str]:
+    previous = {(b["case"], b["impl"], b["source"], b["size"]): b for b in baseline}
+    found = []
+    for r in results:
+        b = previous.get((r.case, r.impl, r.source, r.size))
+        if r.impl != "pyf" or b is None or b["best_s"] == 0:
+            continue
+        ratio = r.best_s / b["best_s"]
+        if ratio > threshold:
+            found.append(f"{r.case} [{r.source}] {b['best_s'] * 1e3:.3f}ms → {r.best_s * 1e3:.3f}ms (x{ratio:.2f})")
+    return found
 
 
 if __name__ == "__main__":
-    vanilla_time = timeit("pipeline_vanilla()", globals=globals(), number=5)
-    pyf_time     = timeit("pipeline_pyf()",     globals=globals(), number=5)
+    parser = argparse.ArgumentParser(description="PyFCollection benchmark suite")
+    parser.add_argument("--size", type=int, default=100_000, help="elements per source")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--only", help="run only the cases whose name contains this text")
+    parser.add_argument("--json", help="write machine readable results to this file")
+    parser.add_argument("--baseline", help="previous JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.size, args.repeat, args.only)
+    print_table(results)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"python": sys.version, "results": [asdict(r) for r in results]}, f, indent=2)
 
-    print(f"PyFCollection   → {pyf_time:.3f}s (5 runs)")
-    print(f"Vanilla Python  → {vanilla_time:.3f}s (5 runs)")
-    print("Sample output  :", pipeline_pyf()[:10])
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f)["results"], args.threshold)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        sys.exit(1 if slower else 0)
@@ -1,6 +1,26 @@
 from __future__ import annotations
 
-from pyf_collection import PyFCollection
+import asyncio
+import os
+import struct
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from pyf_collection import PyFCollection, AsyncPyFCollection
+
+
+async def enrich(user_id: int) -> str:
+    await asyncio.sleep(0.1)  # simulate an I/O call per element
+    return f"user-{user_id}"
+
+
+async def async_pipeline() -> list[str]:
+    return await (AsyncPyFCollection(range(20))
+                  .filter(lambda n: n % 2 == 0)
+                  .map_async(enrich, concurrency=10)
+                  .take(5)
+                  .to_list())
+
 
 if __name__ == "__main__":
     """map"""
@@ -60,3 +80,212 @@ if __name__ == "__main__":
             .slice(2,4)
             .to_list())
     print(resul9)
+
+    """cache"""
+    cached = (PyFCollection(n * 2 for n in range(10))
+              .cache())
+    print(cached.exist(lambda n: n == 4))
+    print(cached.to_list())
+
+    # An error upstream of the cache reaches the caller, no element is dropped silently
+    for broken in (PyFCollection(x for x in [1, 2, "x", 4]).map(lambda n: n + 1).cache(),
+                   PyFCollection([1, 2.5, 3]).cache("q")):
+        try:
+            print(broken.to_list())
+        except TypeError as ex:
+            print(f"cache failed: {ex}")
+
+    """persist"""
+    persisted = (PyFCollection(str(n) for n in range(10))
+                 .persist(spill_to_disk=True, memory_limit=5))
+    print(persisted.find(lambda s: s == "7"))
+    print(persisted.to_list())
+    persisted.map(int).unpersist()
+    try:
+        persisted.to_list()
+    except RuntimeError as ex:
+        print(ex)
+
+    """group_by"""
+    grouping = (PyFCollection(["Hello", "functional", "world", "python"])
+                .group_by(len))
+    groups = grouping.to_list()
+    print(groups)
+    print(grouping.to_list() == groups)
+
+    """reduce_by_key"""
+    totals = (PyFCollection([("apple", 2), ("pear", 1), ("apple", 3)])
+              .reduce_by_key(lambda a, b: a + b)
+              .to_list())
+    print(totals)
+
+    """count_by"""
+    counts = (PyFCollection(["a", "b", "a", "c", "a"])
+              .count_by(lambda s: s)
+              .to_list())
+    print(counts)
+
+    """join"""
+    joined = (PyFCollection([(1, "Pablo"), (2, "Maria"), (3, "John")])
+              .join([(1, "Madrid"), (3, "London")])
+              .to_list())
+    print(joined)
+
+    """left_join"""
+    left_joined = (PyFCollection([(1, "Pablo"), (2, "Maria")])
+                   .left_join([(1, "Madrid")])
+                   .to_list())
+    print(left_joined)
+
+    """sort_by"""
+    sorted_words = (PyFCollection(["Hello", "functional", "world", "python"])
+                    .sort_by(len, reverse=True)
+                    .to_list())
+    print(sorted_words)
+
+    """top_k"""
+    top = (PyFCollection(range(1_000))
+           .top_k(3)
+           .to_list())
+    print(top)
+
+    """fold_left"""
+    reversed_word = (PyFCollection(["a", "b", "c"])
+                     .fold_left("", lambda acc, s: s + acc))
+    print(reversed_word)
+
+    """reduce"""
+    biggest = (PyFCollection([3, 9, 2])
+               .reduce(max))
+    print(biggest)
+
+    """aggregate"""
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        total = (PyFCollection(range(1_000_000))
+                 .aggregate(0, lambda acc, n: acc + n, lambda a, b: a + b, executor=pool))
+    print(total)
+
+    """from_lines / from_csv / from_jsonl / from_binary_records"""
+    with tempfile.TemporaryDirectory() as tmp:
+        log_path = os.path.join(tmp, "app.log")
+        with open(log_path, "w") as f:
+            f.write("INFO start\nERROR boom\nINFO done\n")
+        errors = (PyFCollection.from_lines(log_path)
+                  .filter(lambda line: line.startswith("ERROR"))
+                  .to_list())
+        print(errors)
+
+        csv_path = os.path.join(tmp, "users.csv")
+        with open(csv_path, "w") as f:
+            f.write("id,name\n1,Pablo\n2,Maria\n")
+        names = (PyFCollection.from_csv(csv_path, header=True)
+                 .map(lambda row: row["name"])
+                 .to_list())
+        print(names)
+
+        jsonl_path = os.path.join(tmp, "events.jsonl")
+        with open(jsonl_path, "w") as f:
+            f.write('{"type": "click"}\n{"type": "view"}\n')
+        types = (PyFCollection.from_jsonl(jsonl_path)
+                 .map(lambda event: event["type"])
+                 .to_list())
+        print(types)
+
+        bin_path = os.path.join(tmp, "points.bin")
+        with open(bin_path, "wb") as f:
+            f.write(b"".join(struct.pack("<id", n, n * 1.5) for n in range(5)))
+        points = (PyFCollection.from_binary_records(bin_path, "<id")
+                  .map(lambda record: record[1])
+                  .to_list())
+        print(points)
+
+    """grouped"""
+    grouping = (PyFCollection(range(7))
+                .grouped(3))
+    chunks = grouping.to_list()
+    print(chunks)
+    print(grouping.to_list() == chunks)
+
+    """sliding"""
+    windows = (PyFCollection(range(6))
+               .sliding(3, 2)
+               .to_list())
+    print(windows)
+
+    """batch_by_size"""
+    batches = (PyFCollection([b"ab", b"cde", b"f", b"ghij"])
+               .batch_by_size(len, 5)
+               .to_list())
+    print(batches)
+
+    """window"""
+    ticks = iter([0.0, 0.4, 1.2, 1.5, 3.1])
+    per_second = (PyFCollection(["a", "b", "c", "d", "e"])
+                  .window(1.0, clock=lambda: next(ticks))
+                  .to_list())
+    print(per_second)
+
+    """AsyncPyFCollection map_async"""
+    print(asyncio.run(async_pipeline()))
+
+    """from_array / from_buffer / to_array"""
+    prices = (PyFCollection.from_array("d", [10.5, 11.0, 9.75, 12.25])
+              .drop(1)
+              .take(2)
+              .to_array("d"))
+    print(prices)
+
+    packed = struct.pack("<4q", 1, 2, 3, 4)
+    ids = (PyFCollection.from_buffer(packed, "q")
+           .map(lambda n: n * 100)
+           .to_array("q"))
+    print(ids)
+
+    """cache with typecode"""
+    typed = (PyFCollection(n * n for n in range(1_000))
+             .cache("q"))
+    print(typed.find(lambda n: n > 500))
+    print(len(typed.to_list()))
+
+    """explain"""
+    plan = (PyFCollection([{"id": n, "country": "ES" if n % 2 else "UK"} for n in range(10)])
+            .map(lambda user: {**user, "score": user["id"] * 10}, pure=True)
+            .filter(lambda user: user["country"] == "ES", commutes_with_map=True)
+            .drop(1)
+            .take(2))
+    print(plan.explain())
+    print(plan.to_list())
+
+    """a filter without commutes_with_map stays after the map it reads the output of"""
+    print(PyFCollection([1, 2, 3, 4]).map(lambda x: x * 10, pure=True).filter(lambda x: x > 15).to_list())
+
+    """sorted (external merge sort)"""
+    ordered = (PyFCollection(n * 7919 % 1_000 for n in range(1_000))
+               .sorted(memory_limit=100)
+               .take(5)
+               .to_list())
+    print(ordered)
+
+    """sort_within_chunks"""
+    chunk_sorted = (PyFCollection([3, 1, 2, 9, 8, 7])
+                    .sort_within_chunks(3)
+                    .to_list())
+    print(chunk_sorted)
+    by_length = PyFCollection(["pear", "fig", "banana"]).sorted(key=len)
+    print(by_length.to_list(), by_length.to_list())
+
+    """profile"""
+    profiled = (PyFCollection(range(1_000))
+                .profile()
+                .map(lambda n: n * 2)
+                .filter(lambda n: n % 3 == 0)
+                .count_by(lambda n: n % 2)
+                .to_list())
+    print(profiled)
+
+    # persist/unpersist keep working on a profiled collection, the spill file is removed
+    spilled = (PyFCollection(str(n) for n in range(10))
+               .profile(lambda report: None)
+               .persist(spill_to_disk=True, memory_limit=5))
+    print(len(spilled.to_list()))
+    spilled.unpersist()
@@ -1,4 +1,6 @@
 # Re-export public API
-from .core import PyIO
+from .core import PyIO, PyIOTrace, ResourcePool, RetryPolicy, TraceEvent
+from .async_core import AsyncPyIO
+from .stream_core import PyIOStream
 
-__all__ = ["PyIO"]
+__all__ = ["PyIO", "AsyncPyIO", "PyIOStream", "PyIOTrace", "ResourcePool", "RetryPolicy", "TraceEvent"]
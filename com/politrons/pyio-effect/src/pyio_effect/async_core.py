@@ -0,0 +1,249 @@
+from __future__ import annotations
+
+import asyncio
+import inspect
+from typing import TypeVar, Generic, Callable, Optional, Awaitable, Union
+
+from .core import PyIO
+
+# Define a generic type variable
+T = TypeVar("T")
+U = TypeVar("U")
+
+# Functions given to AsyncPyIO may be plain functions or return an awaitable (coroutine functions)
+MaybeAsync = Union[U, Awaitable[U]]
+
+
+class AsyncPyIO(Generic[T]):
+    """
+    PyIO for asyncio: operators accept plain or coroutine functions, nothing runs until the
+    program is awaited (`await io` or `await io.run()`), and the result is a plain PyIO.
+    Errors are captured exactly like in PyIO, except `asyncio.CancelledError`, which is
+    propagated so cancelling a task still works.
+    """
+
+    def __init__(self, content: Optional[T], error: Optional[BaseException] = None) -> None:
+        state = PyIO(content, error)
+        self._source: Callable[[tuple], Awaitable[PyIO]] = lambda args: _ready(state)
+        self._parent: Optional[AsyncPyIO] = None
+        self._step: Optional[tuple] = None
+        self._steps: Optional[tuple] = None
+
+    @staticmethod
+    def defer(thunk: Callable[..., MaybeAsync[T]]) -> "AsyncPyIO[T]":
+        # The thunk runs (and is awaited when it returns an awaitable) on every run, with the run arguments
+        async def source(args: tuple) -> PyIO:
+            return await _capture(lambda: thunk(*args))
+
+        return AsyncPyIO._of(source)
+
+    @staticmethod
+    def _of(source: Callable[[tuple], Awaitable[PyIO]], parent: "Optional[AsyncPyIO]" = None,
+            step: Optional[tuple] = None) -> "AsyncPyIO":
+        io = AsyncPyIO.__new__(AsyncPyIO)
+        io._source = source
+        io._parent = parent
+        io._step = step
+        io._steps = None
+        return io
+
+    def _then(self, step: Callable, *args) -> "AsyncPyIO":
+        return AsyncPyIO._of(self._source, self, (step, args))
+
+    def _program(self) -> tuple:
+        if self._steps is None:
+            steps = []
+            node = self
+            while node is not None and node._step is not None:
+                if node._steps is not None:
+                    steps.extend(reversed(node._steps))
+                    break
+                steps.append(node._step)
+                node = node._parent
+            self._steps = tuple(reversed(steps))
+        return self._steps
+
+    def __await__(self):
+        return self.run().__await__()
+
+    async def run(self, *args) -> PyIO[T]:
+        # Same trampoline as the deferred PyIO: nested programs are new frames, not nested awaits
+        state = await self._source(args)
+        frames = [[self._program(), 0]]
+        while frames:
+            frame = frames[-1]
+            steps, i = frame
+            if i == len(steps):
+                frames.pop()
+                continue
+            frame[1] = i + 1
+            step, step_args = steps[i]
+            state = await step(state, *step_args)
+            if isinstance(state, AsyncPyIO):
+                if i + 1 == len(steps):
+                    frames.pop()
+                frames.append([state._program(), 0])
+                state = await state._source(())
+        return state
+
+    def map(self, func: Callable[[T], MaybeAsync[U]]) -> "AsyncPyIO[U]":
+        return self._then(_map, func)
+
+    def flat_map(self, func: Callable[[T], MaybeAsync[Union["AsyncPyIO[U]", PyIO[U]]]]) -> "AsyncPyIO[U]":
+        return self._then(_flat_map, func)
+
+    def filter(self, func: Callable[[T], MaybeAsync[bool]]) -> "AsyncPyIO[T]":
+        return self._then(_filter, func)
+
+    def recover(self, func: Callable[[BaseException], MaybeAsync[U]]) -> "AsyncPyIO[U]":
+        return self._then(_recover, func)
+
+    def recover_with(self, func: Callable[[BaseException], MaybeAsync[Union["AsyncPyIO[U]", PyIO[U]]]]) -> "AsyncPyIO[U]":
+        return self._then(_recover_with, func)
+
+    def when(self, predicate: Callable[[T], MaybeAsync[bool]], func: Callable[[T], MaybeAsync[U]]) -> "AsyncPyIO[U]":
+        return self._then(_when, predicate, func)
+
+    def on_parallel(
+            self,
+            func_1: Callable[[T], MaybeAsync[U]],
+            func_2: Callable[[T], MaybeAsync[U]],
+            merge_func: Callable[[U, U], U]
+    ) -> "AsyncPyIO[U]":
+        """
+        Run func_1 and func_2 concurrently on the event loop with asyncio.gather, then merge their results.
+        """
+        return self._then(_on_parallel, func_1, func_2, merge_func)
+
+    def zip_par(self, other: "AsyncPyIO[U]") -> "AsyncPyIO[tuple[T, U]]":
+        """
+        Run both programs concurrently and pair their values.
+        The first failure (in argument order) wins; if either one is empty, so is the result.
+        """
+        async def source(args: tuple) -> PyIO:
+            left, right = await asyncio.gather(self.run(*args), other.run())
+            if left.is_error():
+                return left
+            if right.is_error():
+                return right
+            if left.is_empty() or right.is_empty():
+                return PyIO(None)
+            return PyIO((left.get(), right.get()))
+
+        return AsyncPyIO._of(source)
+
+    def on_error(self, func: Callable[[BaseException], MaybeAsync[None]]) -> "AsyncPyIO[T]":
+        return self._then(_on_error, func)
+
+    def on_success(self, func: Callable[[T], MaybeAsync[None]]) -> "AsyncPyIO[T]":
+        return self._then(_on_success, func)
+
+    async def get(self) -> T:
+        return (await self.run()).get()
+
+    async def get_or_else(self, default: T) -> T:
+        return (await self.run()).get_or_else(default)
+
+
+# ----------------------------- Steps -----------------------------
+
+async def _ready(state: PyIO) -> PyIO:
+    return state
+
+
+async def _resolve(result):
+    if inspect.isawaitable(result):
+        return await result
+    return result
+
+
+async def _capture(call: Callable[[], MaybeAsync[T]]) -> PyIO[T]:
+    try:
+        return PyIO(await _resolve(call()))
+    except asyncio.CancelledError:
+        raise
+    except BaseException as ex:  # Capture *any* runtime error into the pipeline
+        return PyIO(None, ex)
+
+
+def _skip(state: PyIO) -> bool:
+    # If already failed, or value is None (empty success), the step is not applied
+    return state._error is not None or state._value is None
+
+
+async def _map(state: PyIO, func):
+    if _skip(state): return state
+    return await _capture(lambda: func(state._value))
+
+
+async def _flat_map(state: PyIO, func):
+    if _skip(state): return state
+    out = await _capture(lambda: func(state._value))
+    return _flatten(out)
+
+
+async def _filter(state: PyIO, func):
+    if _skip(state): return state
+    keep = await _capture(lambda: func(state._value))
+    if keep.is_error():
+        return keep
+    return state if keep.get() else PyIO(None)
+
+
+async def _recover(state: PyIO, func):
+    if state._error is None: return state
+    return await _capture(lambda: func(state._error))
+
+
+async def _recover_with(state: PyIO, func):
+    if state._error is None: return state
+    out = await _capture(lambda: func(state._error))
+    return _flatten(out)
+
+
+async def _when(state: PyIO, predicate, func):
+    if _skip(state): return state
+    ok = await _capture(lambda: predicate(state._value))
+    if ok.is_error():
+        return ok
+    if ok.get():
+        return await _capture(lambda: func(state._value))
+    return state
+
+
+async def _on_parallel(state: PyIO, func_1, func_2, merge_func):
+    if _skip(state): return state
+
+    async def both():
+        res1, res2 = await asyncio.gather(_resolve(func_1(state._value)), _resolve(func_2(state._value)))
+        return merge_func(res1, res2)
+
+    return await _capture(both)
+
+
+async def _on_error(state: PyIO, func):
+    if state._error is not None:
+        out = await _capture(lambda: func(state._error))
+        if out.is_error():
+            return out
+    return state
+
+
+async def _on_success(state: PyIO, func):
+    if not _skip(state):
+        out = await _capture(lambda: func(state._value))
+        if out.is_error():
+            return out
+    return state
+
+
+def _flatten(out: PyIO):
+    # The value returned by flat_map/recover_with: an AsyncPyIO is run by the trampoline, a PyIO is the new state
+    if out.is_error():
+        return out
+    nested = out._value
+    if isinstance(nested, AsyncPyIO):
+        return nested
+    if isinstance(nested, PyIO):
+        return nested.run()
+    return out
@@ -2,14 +2,499 @@ from __future__ import annotations
 
 import concurrent
 import concurrent.futures
-from typing import TypeVar, Generic, Callable, Optional
+import contextlib
+import contextvars
+import functools
+import json
+import random
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Hashable, Iterable, Iterator, Mapping, Sequence
+from dataclasses import dataclass
+from typing import TypeVar, Generic, Callable, Optional, Union, NamedTuple
 
 # Define a generic type variable
 T = TypeVar("T")
 U = TypeVar("U")
 
+# ----------------------------- Executor -----------------------------
+
+# Long-lived pool shared by every parallel operator, created on first use
+_executor: Optional[concurrent.futures.Executor] = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+
+
+def _mark_worker() -> None:
+    _worker.active = True
+
+
+def _shared_executor() -> concurrent.futures.Executor:
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = concurrent.futures.ThreadPoolExecutor(thread_name_prefix="pyio", initializer=_mark_worker)
+    return _executor
+
+
+def _run_bounded(
+        executor: concurrent.futures.Executor,
+        calls: Iterable[tuple[Callable, object]],
+        max_concurrency: Optional[int]
+) -> list:
+    """
+    Submit (func, arg) calls keeping at most `max_concurrency` in flight, and return the results in order.
+    Fail fast: on the first error the calls not started yet are cancelled and the error is raised
+    without waiting for the ones still running.
+    When the caller is itself a worker of the default shared pool (nested parallel operators), it runs
+    the calls no worker has picked up yet instead of just blocking, so a saturated pool cannot deadlock.
+    """
+    indexed = enumerate(calls)
+    results = {}
+    pending = {}
+
+    def submit_next() -> bool:
+        item = next(indexed, None)
+        if item is None:
+            return False
+        index, (func, arg) = item
+        pending[executor.submit(func, arg)] = (index, func, arg)
+        return True
+
+    while (max_concurrency is None or len(pending) < max_concurrency) and submit_next():
+        pass
+    nested = getattr(_worker, "active", False)
+    try:
+        while pending:
+            stolen = next((f for f in pending if f.cancel()), None) if nested else None
+            if stolen is not None:
+                index, func, arg = pending.pop(stolen)
+                results[index] = func(arg)
+                submit_next()
+                continue
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                index, _, _ = pending.pop(future)
+                results[index] = future.result()  # raises the first error
+                submit_next()
+    finally:
+        for future in pending:
+            future.cancel()
+    return [results[i] for i in range(len(results))]
+
+
+# ----------------------------- Scheduling -----------------------------
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """
+    Exponential backoff: the n-th retry waits initial_delay * multiplier ** (n - 1) seconds,
+    capped at max_delay. With jitter, the wait is a random value between 0 and that delay
+    ("full jitter"), so many clients failing together don't retry in lockstep.
+    """
+    max_attempts: int = 3
+    initial_delay: float = 0.1
+    max_delay: float = 10.0
+    multiplier: float = 2.0
+    jitter: bool = True
+    retry_on: tuple[type[BaseException], ...] = (Exception,)
+
+    def backoff(self, attempt: int) -> float:
+        delay = min(self.max_delay, self.initial_delay * self.multiplier ** (attempt - 1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+
+def _with_retry(program: "PyIO[T]", args: tuple, policy: RetryPolicy) -> "PyIO[T]":
+    attempt = 1
+    while True:
+        try:
+            state = program.run(*args)
+        except BaseException as ex:  # Raised by a step that does not capture its errors: a failed attempt too
+            state = PyIO(None, ex)
+        if (not state.is_error() or attempt >= policy.max_attempts
+                or not isinstance(state.failed(), policy.retry_on)):
+            return state
+        time.sleep(policy.backoff(attempt))
+        attempt += 1
+
+
+def _launch(program: "PyIO[T]", args: tuple) -> concurrent.futures.Future:
+    """
+    Run a program on a thread of its own for timeout/race/hedge. Not the shared pool: their caller blocks
+    waiting on it, so from inside traverse_par/par_map every worker could end up waiting on runs queued
+    behind it. A thread per run cannot starve, and the context (tracing) never leaves the process.
+    """
+    future: concurrent.futures.Future = concurrent.futures.Future()
+    context = contextvars.copy_context()
+
+    def run() -> None:
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(context.run(program.run, *args))
+            except BaseException as ex:
+                future.set_result(PyIO(None, ex))
+
+    threading.Thread(target=run, name="pyio-launch", daemon=True).start()
+    return future
+
+
+def _with_timeout(program: "PyIO[T]", args: tuple, seconds: float) -> "PyIO[T]":
+    try:
+        future = _launch(program, args)
+    except BaseException as ex:  # e.g. no thread can be started
+        return PyIO(None, ex)
+    try:
+        return future.result(timeout=seconds)
+    except concurrent.futures.TimeoutError:
+        # A running thread cannot be interrupted, its result is just ignored
+        future.cancel()
+        return PyIO(None, TimeoutError(f"PyIO did not complete in {seconds}s"))
+
+
+def _first_success(launches: list[tuple[float, "PyIO[T]"]], args: tuple) -> "PyIO[T]":
+    """
+    Start each program after its delay (seconds from now) unless one already succeeded,
+    and return the first success. The others are cancelled if they did not start yet, or ignored.
+    When every program fails, the last failure is returned.
+    """
+    start = time.monotonic()
+    waiting = sorted(launches, key=lambda launch: launch[0])
+    pending = set()
+    last: Optional[PyIO] = None
+    try:
+        while waiting or pending:
+            while waiting and time.monotonic() - start >= waiting[0][0]:
+                pending.add(_launch(waiting.pop(0)[1], args))
+            timeout = None if not waiting else max(0.0, waiting[0][0] - (time.monotonic() - start))
+            if not pending:
+                time.sleep(timeout)
+                continue
+            done, pending = concurrent.futures.wait(pending, timeout=timeout,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                last = future.result()
+                if not last.is_error():
+                    return last
+        return last
+    except BaseException as ex:  # e.g. no thread can be started
+        return PyIO(None, ex)
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+# ----------------------------- Tracing -----------------------------
+
+class TraceEvent(NamedTuple):
+    kind: str  # map, flat_map, on_parallel, par_map, or branch for each function run by the last two
+    name: str  # __qualname__ of the function
+    start_ns: int  # perf_counter_ns
+    duration_ns: int
+    thread_id: int
+    thread_name: str
+    outcome: str  # success, empty or error
+    error: Optional[str]
+
+
+class PyIOTrace:
+    """
+    Steps recorded while a [PyIO.tracing] block is active, in the order they completed.
+    Parallel branches are recorded on the thread they ran on.
+    """
+
+    def __init__(self) -> None:
+        self.events: list[TraceEvent] = []
+        self._origin = time.perf_counter_ns()
+
+    def record(self, kind: str, name: str, start_ns: int, outcome: "Union[PyIO, BaseException, object]") -> None:
+        if isinstance(outcome, BaseException):
+            status, error = "error", repr(outcome)
+        elif isinstance(outcome, PyIO) and outcome._error is not None:
+            status, error = "error", repr(outcome._error)
+        elif outcome is None or (isinstance(outcome, PyIO) and outcome._value is None):
+            status, error = "empty", None
+        else:
+            status, error = "success", None
+        thread = threading.current_thread()
+        # list.append is atomic, worker threads record without a lock
+        self.events.append(TraceEvent(kind, name, start_ns, time.perf_counter_ns() - start_ns,
+                                      thread.ident, thread.name, status, error))
+
+    def to_chrome(self) -> dict:
+        # Chrome trace-event format (chrome://tracing, Perfetto): complete events with microsecond timestamps
+        events = [{"name": e.name, "cat": e.kind, "ph": "X", "pid": 1, "tid": e.thread_id,
+                   "ts": (e.start_ns - self._origin) / 1000, "dur": e.duration_ns / 1000,
+                   "args": {"outcome": e.outcome, **({"error": e.error} if e.error else {})}}
+                  for e in self.events]
+        threads = {e.thread_id: e.thread_name for e in self.events}
+        events.extend({"name": "thread_name", "ph": "M", "pid": 1, "tid": tid, "args": {"name": name}}
+                      for tid, name in threads.items())
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def dump(self, path: str) -> None:
+        with open(path, "w") as f:
+            json.dump(self.to_chrome(), f)
+
+
+# The trace of the current context: None (the default) keeps every operator on its untraced path
+_trace: contextvars.ContextVar[Optional[PyIOTrace]] = contextvars.ContextVar("pyio_trace", default=None)
+
+
+def _qualname(func: Callable) -> str:
+    return getattr(func, "__qualname__", None) or type(func).__qualname__
+
+
+def _traced(trace: PyIOTrace, func: Callable[[T], U]) -> Callable[[T], U]:
+    # A parallel branch, recorded on the worker thread that runs it
+    def branch(value: T) -> U:
+        start = time.perf_counter_ns()
+        try:
+            result = func(value)
+        except BaseException as ex:
+            trace.record("branch", _qualname(func), start, ex)
+            raise
+        trace.record("branch", _qualname(func), start, result)
+        return result
+
+    return branch
+
+
+# ----------------------------- Memoization -----------------------------
+
+class _Memo:
+    """
+    LRU cache of PyIO results with an optional time to live, shared by every call of a [cached] function.
+    Concurrent calls for a key that is being computed wait for that computation instead of starting
+    their own (single-flight).
+    """
+
+    def __init__(self, func: Callable[..., object], key_fn: Optional[Callable[..., Hashable]],
+                 ttl: Optional[float], maxsize: Optional[int], cache_failures: bool) -> None:
+        self._func = func
+        self._key_fn = key_fn
+        self._ttl = ttl
+        self._maxsize = maxsize
+        self._cache_failures = cache_failures
+        self._entries: OrderedDict = OrderedDict()  # key -> (expires_at, PyIO), least recently used first
+        self._in_flight: dict = {}  # key -> Future of the PyIO being computed
+        self._lock = threading.Lock()
+
+    def __call__(self, *args) -> "PyIO":
+        key = self._key_fn(*args) if self._key_fn is not None else args
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if entry[0] is None or entry[0] > time.monotonic():
+                    self._entries.move_to_end(key)
+                    return entry[1]
+                del self._entries[key]
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = concurrent.futures.Future()
+        if not leader:
+            return future.result()
+        try:
+            state = _run_effect(self._func, args)
+        except BaseException as ex:
+            # Not cached: the waiters get the same error, and the next call for the key computes it again
+            with self._lock:
+                del self._in_flight[key]
+            future.set_exception(ex)
+            raise
+        with self._lock:
+            del self._in_flight[key]
+            if self._cache_failures or not state.is_error():
+                self._store(key, state)
+        future.set_result(state)
+        return state
+
+    def _store(self, key: Hashable, state: "PyIO") -> None:
+        expires_at = None if self._ttl is None else time.monotonic() + self._ttl
+        self._entries[key] = (expires_at, state)
+        self._entries.move_to_end(key)
+        if self._maxsize is not None and len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, *args) -> None:
+        key = self._key_fn(*args) if self._key_fn is not None else args
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+# ----------------------------- Batching -----------------------------
+
+class _Window:
+    # Keys collected for one batch_fn call, dispatched by the caller that opened the window
+    __slots__ = ("keys", "futures", "deadline", "full")
+
+    def __init__(self, deadline: float) -> None:
+        self.keys: dict = {}  # key -> Futures of its callers, duplicated keys are sent once
+        self.futures = 0
+        self.deadline = deadline
+        self.full = threading.Event()
+
+
+class _Batcher:
+    """
+    Data loader: keys requested within `max_wait` seconds of the first one (or until `max_batch` of them)
+    are sent as a single `batch_fn(keys)` call, and each caller gets its own result back.
+    The caller that opened the window waits for it to close and makes the call, so no background thread is needed.
+    """
+
+    def __init__(self, batch_fn: Callable[[list], object], max_batch: int, max_wait: float) -> None:
+        self._batch_fn = batch_fn
+        self._max_batch = max_batch
+        self._max_wait = max_wait
+        self._window: Optional[_Window] = None
+        self._lock = threading.Lock()
+
+    def _enqueue(self, key: Hashable) -> tuple[concurrent.futures.Future, Optional[_Window]]:
+        future = concurrent.futures.Future()
+        with self._lock:
+            window = self._window
+            opened = window is None
+            if opened:
+                window = self._window = _Window(time.monotonic() + self._max_wait)
+            window.keys.setdefault(key, []).append(future)
+            if len(window.keys) >= self._max_batch:
+                self._window = None
+                window.full.set()
+        return future, (window if opened else None)
+
+    def _dispatch(self, window: _Window) -> None:
+        window.full.wait(max(0.0, window.deadline - time.monotonic()))
+        with self._lock:
+            if self._window is window:
+                self._window = None
+        keys = list(window.keys)
+        try:
+            found = self._batch_fn(keys)
+            if not isinstance(found, Mapping):
+                found = list(found)
+                if len(found) != len(keys):
+                    raise ValueError(f"batch_fn returned {len(found)} results for {len(keys)} keys")
+                found = dict(zip(keys, found))
+            states = {key: PyIO(found.get(key)) for key in keys}
+        except BaseException as ex:  # Capture *any* runtime error into every caller
+            states = {key: PyIO(None, ex) for key in keys}
+        for key, futures in window.keys.items():
+            for future in futures:
+                future.set_result(states[key])
+
+    def load(self, key: Hashable) -> "PyIO":
+        future, window = self._enqueue(key)
+        if window is not None:
+            self._dispatch(window)
+        return future.result()
+
+    def load_many(self, keys: Iterable[Hashable]) -> "PyIO[list]":
+        enqueued = [self._enqueue(key) for key in keys]
+        for _, window in enqueued:
+            if window is not None:
+                self._dispatch(window)
+        states = [future.result() for future, _ in enqueued]
+        failed = next((state for state in states if state.is_error()), None)
+        return failed if failed is not None else PyIO([state._value for state in states])
+
+
+# ----------------------------- Resources -----------------------------
+
+class ResourcePool(Generic[T]):
+    """
+    Up to `size` resources created on demand by `factory` and reused across runs.
+    [use] borrows one for the duration of a function (waiting while all of them are borrowed) and always gives it
+    back; with `discard_on_error` a resource whose use failed is closed instead, so the next borrower gets a new one.
+    """
+
+    def __init__(self, factory: Callable[[], T], size: int, close: Optional[Callable[[T], None]] = None,
+                 discard_on_error: bool = False) -> None:
+        if size < 1:
+            raise ValueError("size must be positive")
+        self._factory = factory
+        self._size = size
+        self._close = close
+        self._discard_on_error = discard_on_error
+        self._idle: list[T] = []
+        self._created = 0
+        self._closed = False
+        self._available = threading.Condition()
+
+    def acquire(self, timeout: Optional[float] = None) -> T:
+        with self._available:
+            if not self._available.wait_for(lambda: self._closed or self._idle or self._created < self._size, timeout):
+                raise TimeoutError(f"no resource available in {timeout}s")
+            if self._closed:
+                raise RuntimeError("pool is closed")
+            if self._idle:
+                return self._idle.pop()
+            self._created += 1
+        try:
+            return self._factory()
+        except BaseException:
+            self._forget()
+            raise
+
+    def release(self, resource: T, broken: bool = False) -> None:
+        with self._available:
+            keep = not broken and not self._closed
+            if keep:
+                self._idle.append(resource)
+                self._available.notify()
+        if not keep:
+            self._forget()
+            self._dispose(resource)
+
+    def use(self, func: Callable[[T], U], timeout: Optional[float] = None) -> "PyIO[U]":
+        # bracket over the pool: acquire (waiting at most `timeout`), run func, always release
+        def release(resource: T, state: PyIO) -> None:
+            self.release(resource, broken=self._discard_on_error and state.is_error())
+
+        return _bracket(lambda: self.acquire(timeout), func, release)
+
+    def close(self) -> None:
+        # Close the idle resources now, and the borrowed ones when they are released
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._available.notify_all()
+        for resource in idle:
+            self._dispose(resource)
+
+    def _forget(self) -> None:
+        with self._available:
+            self._created -= 1
+            self._available.notify()
+
+    def _dispose(self, resource: T) -> None:
+        if self._close is not None:
+            self._close(resource)
+
+
+def _bracket(acquire: Callable[[], T], use: Callable[[T], U], release: Callable[[T, "PyIO[U]"], None]) -> "PyIO[U]":
+    acquired = _evaluate(acquire, ())
+    if acquired._error is not None:
+        return acquired
+    resource = acquired._value
+    try:
+        state = _run_effect(use, (resource,))
+    except BaseException as ex:  # A program returned by `use` raised when run: still released
+        state = PyIO(None, ex)
+    released = _evaluate(release, (resource, state))
+    # A release failure only surfaces when the use itself succeeded
+    return released if released._error is not None and state._error is None else state
+
 
 class PyIO(Generic[T]):
+    # Two slots and no __dict__: every operator returns a new PyIO, so its size is the allocation rate of a pipeline
+    __slots__ = ("_value", "_error")
 
     def __init__(self, content: Optional[T], error: Optional[BaseException] = None) -> None:
         # Store either a value or an error (never both)
@@ -17,44 +502,78 @@ class PyIO(Generic[T]):
         self._value: Optional[T] = content if error is None else None
         self._error: Optional[BaseException] = error
 
+    @staticmethod
+    def defer(thunk: Callable[..., T]) -> "PyIO[T]":
+        """
+        Lazy PyIO: nothing runs until [run]. Every operator just records a step, so the same
+        program can be run again, retried, or run with different inputs passed to `thunk`.
+        """
+        return _DeferredPyIO(thunk)
+
+    def run(self, *args) -> "PyIO[T]":
+        # An eager PyIO has already run
+        return self
+
+    # Time aware operators, they only make sense on a program (see [defer]): an eager PyIO
+    # has already run, so there is nothing to time out, retry or hedge.
+
+    def timeout(self, seconds: float) -> "PyIO[T]":
+        return self
+
+    def retry(self, policy: RetryPolicy = RetryPolicy()) -> "PyIO[T]":
+        return self
+
+    def hedge(self, after_ms: float) -> "PyIO[T]":
+        return self
+
+    def race(self, other: "PyIO[T]") -> "PyIO[T]":
+        return self if self.is_success() else other.run()
+
     def map(self, func: Callable[[T], U]) -> "PyIO[U]":
         # If already failed, propagate the same failure
         # If value is None, treat it like an empty success and propagate None
         if self._error is not None or self._value is None: return self
+        trace = _trace.get()
+        start = trace and time.perf_counter_ns()
         # Apply the side-effecting function and capture any runtime error
         try:
-            return PyIO(func(self._value))
+            out = _success(func(self._value))
         except BaseException as ex:  # Capture *any* runtime error into the pipeline
-            return PyIO[U](None, ex)
+            out = PyIO(None, ex)
+        if trace is not None:
+            trace.record("map", _qualname(func), start, out)
+        return out
 
     def flat_map(self, func: Callable[[T], "PyIO[U]"]) -> "PyIO[U]":
         # If already failed, propagate the same failure
         # If value is None, treat it like an empty success and propagate None
         if self._error is not None or self._value is None: return self
         # Run the effectful step; capture thrown errors
+        # A failed PyIO returned by the step already is the failure to propagate
+        trace = _trace.get()
+        start = trace and time.perf_counter_ns()
         try:
             out = func(self._value)
-            # If the returned PyIO is failed, propagate that failure
-            if isinstance(out, PyIO) and out._error is not None:
-                return PyIO[U](None, out._error)
-            return out
         except BaseException as ex:
-            return PyIO[U](None, ex)
+            out = PyIO(None, ex)
+        if trace is not None:
+            trace.record("flat_map", _qualname(func), start, out)
+        return out
 
     def filter(self, func: Callable[[T], bool]) -> "PyIO[T]":
         if self._error is not None or self._value is None: return self
         if func(self._value):
             return self
-        return PyIO(None, None)
+        return _EMPTY
 
     def recover(self, func: Callable[[BaseException], U]) -> "PyIO[U]":
         # If is not failed, propagate the same instance
         if self._error is None: return self
         # Apply the side-effecting function and capture any runtime error
         try:
-            return PyIO(func(self._error), None)
+            return _success(func(self._error))
         except BaseException as ex:  # Capture *any* runtime error into the pipeline
-            return PyIO[U](None, ex)
+            return PyIO(None, ex)
 
     def recover_with(self, func: Callable[[BaseException], "PyIO[U]"]) -> "PyIO[U]":
         # If is not failed, propagate the same instance
@@ -63,13 +582,13 @@ class PyIO(Generic[T]):
         try:
             return func(self._error)
         except BaseException as ex:  # Capture *any* runtime error into the pipeline
-            return PyIO[U](None, ex)
+            return PyIO(None, ex)
 
     def when(self, predicate: Callable[[T], bool], func: Callable[[T], U]) -> "PyIO[U]":
         if self._error is not None or self._value is None: return self
         # If predicate is true we apply second function
         if predicate(self._value):
-            return PyIO[U](func(self._value))
+            return _success(func(self._value))
         return self
 
     def on_parallel(
@@ -80,30 +599,176 @@ class PyIO(Generic[T]):
             max_workers: int | None = None
     ) -> "PyIO[U]":
         """
-        Run func_1 and func_2 concurrently, then merge their results.
+        Run func_1 and func_2 concurrently on the shared executor, then merge their results.
         """
         if self._error is not None or self._value is None:
             return self
-        try:
-            with concurrent.futures.ThreadPoolExecutor(
-                max_workers=max_workers
-            ) as ex:
-                fut1 = ex.submit(func_1, self._value)
-                fut2 = ex.submit(func_2, self._value)
-                res1, res2 = fut1.result(), fut2.result()
+        trace = _trace.get()
+        start = trace and time.perf_counter_ns()
+        out = self._fan_out([func_1, func_2], max_workers, None)
+        if out._error is None:
+            out = _evaluate(merge_func, tuple(out._value))
+        if trace is not None:
+            trace.record("on_parallel", _qualname(merge_func), start, out)
+        return out
 
-            return PyIO(merge_func(res1, res2))
+    def par_map(
+            self,
+            funcs: list[Callable[[T], U]],
+            max_concurrency: int | None = None,
+            executor: concurrent.futures.Executor | None = None
+    ) -> "PyIO[list[U]]":
+        """
+        Run every function on the value concurrently, at most `max_concurrency` at a time,
+        and collect their results in order. The first error fails the PyIO and cancels the rest.
+        """
+        if self._error is not None or self._value is None:
+            return self
+        trace = _trace.get()
+        start = trace and time.perf_counter_ns()
+        out = self._fan_out(funcs, max_concurrency, executor)
+        if trace is not None:
+            trace.record("par_map", ", ".join(_qualname(f) for f in funcs), start, out)
+        return out
 
+    def _fan_out(
+            self,
+            funcs: list[Callable[[T], U]],
+            max_concurrency: int | None,
+            executor: concurrent.futures.Executor | None
+    ) -> "PyIO[list[U]]":
+        executor = executor or _shared_executor()
+        trace = _trace.get()
+        if trace is not None and isinstance(executor, concurrent.futures.ThreadPoolExecutor):
+            # Only thread pools: the branch wrapper is a closure, a process pool could not pickle it
+            funcs = [_traced(trace, f) for f in funcs]
+        value = self._value
+        try:
+            return PyIO(_run_bounded(executor, ((f, value) for f in funcs), max_concurrency))
         except BaseException as ex:
             return PyIO(None, ex)
 
+    @staticmethod
+    def traverse_par(
+            items: Iterable[T],
+            func: Callable[[T], U],
+            max_concurrency: int | None = None,
+            executor: concurrent.futures.Executor | None = None
+    ) -> "PyIO[list[U]]":
+        """
+        Apply `func` to every item concurrently, at most `max_concurrency` at a time, and collect
+        the results in order. The first error fails the PyIO and cancels the rest.
+        """
+        try:
+            return PyIO(_run_bounded(executor or _shared_executor(), ((func, x) for x in items), max_concurrency))
+        except BaseException as ex:
+            return PyIO(None, ex)
+
+    @staticmethod
+    @contextlib.contextmanager
+    def tracing() -> Iterator[PyIOTrace]:
+        """
+        Opt-in tracing: inside the block, every map/flat_map/on_parallel/par_map step run in this context
+        (thread or asyncio task) is recorded with its function name, duration, thread and outcome,
+        as well as each parallel branch. Export with `trace.to_chrome()` or `trace.dump(path)`.
+        """
+        trace = PyIOTrace()
+        token = _trace.set(trace)
+        try:
+            yield trace
+        finally:
+            _trace.reset(token)
+
+    @staticmethod
+    def cached(
+            key_fn: Optional[Callable[..., Hashable]] = None,
+            ttl: Optional[float] = None,
+            maxsize: Optional[int] = 128,
+            cache_failures: bool = False
+    ) -> Callable[[Callable[..., U]], Callable[..., "PyIO[U]"]]:
+        """
+        Decorator memoizing an effectful function: the decorated function returns a PyIO, computed once per
+        key (`key_fn(*args)`, the arguments by default) and reused for `ttl` seconds, keeping at most
+        `maxsize` keys (least recently used evicted first). Concurrent calls for the same key share one call.
+        Failures are not cached unless `cache_failures`. The function may also return a PyIO, which is run.
+        The decorated function has `invalidate(*args)` and `clear()`.
+        """
+
+        def decorator(func: Callable[..., U]) -> Callable[..., "PyIO[U]"]:
+            memo = _Memo(func, key_fn, ttl, maxsize, cache_failures)
+
+            @functools.wraps(func)
+            def cached_func(*args) -> "PyIO[U]":
+                return memo(*args)
+
+            cached_func.invalidate = memo.invalidate
+            cached_func.clear = memo.clear
+            return cached_func
+
+        return decorator
+
+    @staticmethod
+    def batched(
+            batch_fn: Callable[[list], Union[Mapping, Sequence]],
+            max_batch: int = 100,
+            max_wait_ms: float = 5
+    ) -> Callable[[Hashable], "PyIO"]:
+        """
+        Data loader: returns a function `key -> PyIO` whose calls, when made concurrently within `max_wait_ms`
+        of each other, are coalesced into one `batch_fn(keys)` call (at most `max_batch` distinct keys).
+        `batch_fn` returns a mapping key -> value (a missing key gives an empty PyIO) or a sequence in
+        the order of the keys. When it fails, every caller of the batch gets the error.
+        The loader also has `load_many(keys)`, batching a whole list of keys from a single caller.
+        """
+        if max_batch < 1:
+            raise ValueError("max_batch must be positive")
+        batcher = _Batcher(batch_fn, max_batch, max_wait_ms / 1000)
+
+        def load(key: Hashable) -> "PyIO":
+            return batcher.load(key)
+
+        load.load_many = batcher.load_many
+        return load
+
+    @staticmethod
+    def bracket(
+            acquire: Callable[[], U],
+            use: Callable[[U], T],
+            release: Callable[[U], None]
+    ) -> "PyIO[T]":
+        """
+        Acquire a resource, use it, and always release it, even when `use` fails (or returns a failed PyIO).
+        If `acquire` fails nothing is released. If only `release` fails, the PyIO fails with that error.
+        """
+        return _bracket(acquire, use, lambda resource, state: release(resource))
+
+    @staticmethod
+    def pool(
+            factory: Callable[[], U],
+            size: int,
+            close: Optional[Callable[[U], None]] = None,
+            discard_on_error: bool = False
+    ) -> ResourcePool[U]:
+        # Pool of reusable resources, borrowed with `pool.use(func)` -> PyIO (see ResourcePool)
+        return ResourcePool(factory, size, close, discard_on_error)
+
+    @staticmethod
+    def use_executor(executor: concurrent.futures.Executor) -> None:
+        """
+        Replace the shared executor used by on_parallel/par_map/traverse_par, e.g. with a
+        ProcessPoolExecutor for CPU-bound functions (which then need to be picklable).
+        """
+        global _executor
+        with _executor_lock:
+            _executor = executor
+
     def on_error(self, func: Callable[[BaseException], None]) -> "PyIO[T]":
         # If already failed, we execute the consumer function provided
         if self._error is not None:
             try:
                 func(self._error)
             except BaseException as ex:
-                return PyIO[U](None, ex)
+                return PyIO(None, ex)
         return self
 
     def on_success(self, func: Callable[[T], None]) -> "PyIO[T]":
@@ -112,7 +777,7 @@ class PyIO(Generic[T]):
             try:
                 func(self._value)
             except BaseException as ex:
-                return PyIO[U](None, ex)
+                return PyIO(None, ex)
         return self
 
     def is_success(self) -> bool:
@@ -138,3 +803,169 @@ class PyIO(Generic[T]):
         if self._error is not None or self._value is None:
             return default
         return self._value
+
+
+# Empty success (value None) is immutable and very common (filter, side effects returning None),
+# so it is a single shared instance instead of a new PyIO each time
+_EMPTY: PyIO = PyIO(None)
+
+
+def _success(value: T) -> PyIO[T]:
+    return _EMPTY if value is None else PyIO(value)
+
+
+# ----------------------------- Deferred -----------------------------
+
+class _DeferredPyIO(PyIO[T]):
+    """
+    A program: the thunk that produces the first value plus the steps recorded after it.
+    Each node only links to its parent, so adding a step is O(1) whatever the depth of the program.
+    """
+    __slots__ = ("_thunk", "_parent", "_step", "_steps", "_lifted")
+
+    def __init__(self, thunk: Callable[..., T], parent: "Optional[_DeferredPyIO]" = None,
+                 step: Optional[tuple[str, tuple]] = None, lifted: bool = False) -> None:
+        super().__init__(None)
+        self._thunk = thunk
+        self._parent = parent
+        self._step = step
+        self._steps: Optional[tuple] = None
+        # A lifted thunk already returns a PyIO (the result of a whole wrapped program)
+        self._lifted = lifted
+
+    def _then(self, name: str, *args) -> "PyIO":
+        return _DeferredPyIO(self._thunk, self, (name, args), self._lifted)
+
+    def _start(self, args: tuple) -> PyIO[T]:
+        if self._lifted:
+            return self._thunk(*args)
+        return _evaluate(self._thunk, args)
+
+    def _wrap(self, run: Callable[..., PyIO[T]]) -> "PyIO[T]":
+        return _DeferredPyIO(run, lifted=True)
+
+    def _program(self) -> tuple:
+        # Flatten the chain of steps once, then reuse it on every run
+        if self._steps is None:
+            steps = []
+            node = self
+            while node is not None and node._step is not None:
+                if node._steps is not None:
+                    steps.extend(reversed(node._steps))
+                    break
+                steps.append(node._step)
+                node = node._parent
+            self._steps = tuple(reversed(steps))
+        return self._steps
+
+    def run(self, *args) -> "PyIO[T]":
+        """
+        Interpret the program with a loop over an explicit stack of frames (a trampoline), so neither
+        long pipelines nor deferred PyIOs returned from flat_map/recover_with grow the Python stack.
+        """
+        state = self._start(args)
+        frames = [[self._program(), 0]]
+        while frames:
+            frame = frames[-1]
+            steps, i = frame
+            if i == len(steps):
+                frames.pop()
+                continue
+            frame[1] = i + 1
+            name, step_args = steps[i]
+            state = getattr(state, name)(*step_args)
+            if isinstance(state, _DeferredPyIO):
+                # Nested program: run its thunk and continue with its steps
+                if i + 1 == len(steps):
+                    frames.pop()  # tail position, nothing left to come back to
+                frames.append([state._program(), 0])
+                state = state._start(())
+        return state
+
+    def map(self, func):
+        return self._then("map", func)
+
+    def flat_map(self, func):
+        return self._then("flat_map", func)
+
+    def filter(self, func):
+        return self._then("filter", func)
+
+    def recover(self, func):
+        return self._then("recover", func)
+
+    def recover_with(self, func):
+        return self._then("recover_with", func)
+
+    def when(self, predicate, func):
+        return self._then("when", predicate, func)
+
+    def on_parallel(self, func_1, func_2, merge_func, max_workers=None):
+        return self._then("on_parallel", func_1, func_2, merge_func, max_workers)
+
+    def par_map(self, funcs, max_concurrency=None, executor=None):
+        return self._then("par_map", funcs, max_concurrency, executor)
+
+    def timeout(self, seconds: float) -> "PyIO[T]":
+        """
+        Fail with TimeoutError when the program so far takes longer than `seconds`.
+        It runs on a thread of its own; a run that times out is abandoned, not interrupted.
+        """
+        return self._wrap(lambda *args: _with_timeout(self, args, seconds))
+
+    def retry(self, policy: RetryPolicy = RetryPolicy()) -> "PyIO[T]":
+        # Run the program so far again while it fails, waiting between attempts as the policy says
+        return self._wrap(lambda *args: _with_retry(self, args, policy))
+
+    def race(self, other: "PyIO[T]") -> "PyIO[T]":
+        # Run both programs concurrently and keep the first success
+        return self._wrap(lambda *args: _first_success([(0.0, self), (0.0, other)], args))
+
+    def hedge(self, after_ms: float) -> "PyIO[T]":
+        """
+        Tail latency hedging: when the program has not completed after `after_ms`, start a
+        second copy of it and keep whichever succeeds first.
+        """
+        return self._wrap(lambda *args: _first_success([(0.0, self), (after_ms / 1000, self)], args))
+
+    def on_error(self, func):
+        return self._then("on_error", func)
+
+    def on_success(self, func):
+        return self._then("on_success", func)
+
+    # Inspection and extraction run the program, without inputs, on every call:
+    # `if p.is_success(): p.get()` runs it twice, so inspect the PyIO returned by [run] instead
+
+    def is_success(self) -> bool:
+        return self.run().is_success()
+
+    def is_error(self) -> bool:
+        return self.run().is_error()
+
+    def is_empty(self) -> bool:
+        return self.run().is_empty()
+
+    def get(self) -> T:
+        return self.run().get()
+
+    def failed(self) -> BaseException:
+        return self.run().failed()
+
+    def get_or_else(self, default: T) -> T:
+        return self.run().get_or_else(default)
+
+
+def _evaluate(thunk: Callable[..., T], args: tuple) -> PyIO[T]:
+    try:
+        return _success(thunk(*args))
+    except BaseException as ex:
+        return PyIO(None, ex)
+
+
+def _run_effect(func: Callable[..., object], args: tuple) -> PyIO:
+    # Call an effectful function that may return a plain value or a PyIO, which is run
+    state = _evaluate(func, args)
+    if state._error is None and isinstance(state._value, PyIO):
+        return state._value.run()
+    return state
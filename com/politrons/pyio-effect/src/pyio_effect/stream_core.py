@@ -0,0 +1,261 @@
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from collections import deque
+from collections.abc import Iterable, Iterator
+from typing import TypeVar, Generic, Callable, Optional, Union
+
+from .core import PyIO, _evaluate, _shared_executor, _success, _worker
+
+# Define a generic type variable
+T = TypeVar("T")
+U = TypeVar("U")
+
+# A stage turns the elements of the previous one into new elements, lazily
+Stage = Callable[[Iterator[PyIO]], Iterator[PyIO]]
+
+
+class PyIOStream(Generic[T]):
+    """
+    Lazy sequence of effectful elements. Each element is a PyIO, so an error only fails its own element:
+    the next steps skip it and the stream goes on, until a terminal operation meets it ([recover] or
+    [drop_errors] before that to keep going). Empty elements (a None value, a filtered out element) are dropped.
+    Nothing runs until [run_collect]/[run_drain], which pull one element at a time through every step,
+    so memory stays constant whatever the size of the source (buffers are bounded).
+    The source is iterated on every run: a list can be run again, a generator only once.
+    """
+
+    def __init__(self, source: Iterable[Union[T, PyIO[T]]], stages: tuple[Stage, ...] = ()) -> None:
+        self._source = source
+        self._stages = stages
+
+    def _then(self, stage: Stage) -> "PyIOStream":
+        return PyIOStream(self._source, self._stages + (stage,))
+
+    def _elements(self) -> Iterator[PyIO]:
+        it: Iterator[PyIO] = _lift(self._source)
+        for stage in self._stages:
+            it = stage(it)
+        return it
+
+    def map(self, func: Callable[[T], U]) -> "PyIOStream[U]":
+        return self._then(lambda it: _non_empty(state.map(func) for state in it))
+
+    def flat_map(self, func: Callable[[T], PyIO[U]]) -> "PyIOStream[U]":
+        # One PyIO per element, a deferred one is run
+        return self._then(lambda it: _non_empty(state.flat_map(func).run() for state in it))
+
+    def filter(self, func: Callable[[T], bool]) -> "PyIOStream[T]":
+        return self._then(lambda it: _non_empty(_filter(state, func) for state in it))
+
+    def recover(self, func: Callable[[BaseException], U]) -> "PyIOStream[U]":
+        return self._then(lambda it: _non_empty(state.recover(func) for state in it))
+
+    def on_error(self, func: Callable[[BaseException], None]) -> "PyIOStream[T]":
+        return self._then(lambda it: (state.on_error(func) for state in it))
+
+    def on_success(self, func: Callable[[T], None]) -> "PyIOStream[T]":
+        return self._then(lambda it: (state.on_success(func) for state in it))
+
+    def drop_errors(self, handler: Optional[Callable[[BaseException], None]] = None) -> "PyIOStream[T]":
+        # Remove the failed elements, passing their error to `handler` first
+        def stage(it: Iterator[PyIO]) -> Iterator[PyIO]:
+            for state in it:
+                if state._error is None:
+                    yield state
+                elif handler is not None:
+                    handler(state._error)
+
+        return self._then(stage)
+
+    def take(self, n: int) -> "PyIOStream[T]":
+        def stage(it: Iterator[PyIO]) -> Iterator[PyIO]:
+            for i, state in enumerate(it):
+                if i >= n:
+                    return
+                yield state
+
+        return self._then(stage)
+
+    def map_par(self, func: Callable[[T], U], n: int) -> "PyIOStream[U]":
+        """
+        Apply `func` on the shared executor with at most `n` elements in flight, keeping the source order.
+        No new element is pulled while the oldest one is not done, so the work ahead stays bounded.
+        """
+        if n < 1:
+            raise ValueError("n must be positive")
+        return self._then(lambda it: _map_par(it, func, n))
+
+    def buffer(self, n: int) -> "PyIOStream[T]":
+        """
+        Run the steps so far on a background thread, up to `n` elements ahead of the consumer,
+        so a slow source and a slow consumer overlap instead of waiting for each other.
+        """
+        if n < 1:
+            raise ValueError("n must be positive")
+        return self._then(lambda it: _buffer(it, n))
+
+    def throttle(self, rate: float) -> "PyIOStream[T]":
+        # At most `rate` elements per second, evenly spaced
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        return self._then(lambda it: _throttle(it, 1 / rate))
+
+    def run_collect(self) -> PyIO[list[T]]:
+        # Values of every element in order, or the first error (which stops the stream)
+        values = []
+        elements = self._elements()
+        try:
+            for state in elements:
+                if state._error is not None:
+                    return state
+                values.append(state._value)
+        except BaseException as ex:  # A step outside of the PyIO operators failed
+            return PyIO(None, ex)
+        finally:
+            _close(elements)
+        return PyIO(values)
+
+    def run_drain(self) -> PyIO[int]:
+        # Run the stream for its side effects: the number of elements, or the first error (which stops the stream)
+        count = 0
+        elements = self._elements()
+        try:
+            for state in elements:
+                if state._error is not None:
+                    return state
+                count += 1
+        except BaseException as ex:
+            return PyIO(None, ex)
+        finally:
+            _close(elements)
+        return PyIO(count)
+
+
+# ----------------------------- Stages -----------------------------
+
+def _lift(source: Iterable) -> Iterator[PyIO]:
+    # Elements may be plain values or PyIO. A failing source ends the stream with a failed element
+    it = iter(source)
+    while True:
+        try:
+            x = next(it)
+        except StopIteration:
+            return
+        except BaseException as ex:
+            yield PyIO(None, ex)
+            return
+        state = x.run() if isinstance(x, PyIO) else _success(x)
+        if _present(state):
+            yield state
+
+
+def _present(state: PyIO) -> bool:
+    # Failed or holding a value: empty elements are dropped from the stream
+    return state._error is not None or state._value is not None
+
+
+def _non_empty(it: Iterator[PyIO]) -> Iterator[PyIO]:
+    return filter(_present, it)
+
+
+def _filter(state: PyIO, func: Callable) -> PyIO:
+    # PyIO.filter lets a failing predicate raise: here it only fails its own element
+    try:
+        return state.filter(func)
+    except BaseException as ex:
+        return PyIO(None, ex)
+
+
+def _map_par(it: Iterator[PyIO], func: Callable, n: int) -> Iterator[PyIO]:
+    executor = _shared_executor()
+    # Run from a worker of the shared pool (nested in traverse_par/par_map), like [_run_bounded]
+    nested = getattr(_worker, "active", False)
+    pending: deque = deque()  # PyIO already failed, or (future, value) of the mapped element
+    try:
+        for state in it:
+            if state._error is not None:
+                pending.append(state)
+            else:
+                pending.append((executor.submit(_evaluate, func, (state._value,)), state._value))
+            if len(pending) >= n:
+                state = _result(pending.popleft(), func, nested)
+                if _present(state):
+                    yield state
+        while pending:
+            state = _result(pending.popleft(), func, nested)
+            if _present(state):
+                yield state
+    finally:
+        for item in pending:
+            if not isinstance(item, PyIO):
+                item[0].cancel()
+
+
+def _result(item, func: Callable, nested: bool) -> PyIO:
+    if isinstance(item, PyIO):
+        return item
+    future, value = item
+    if nested and future.cancel():
+        # No worker picked it up yet: run it here instead of blocking a worker of the same pool
+        return _evaluate(func, (value,))
+    return future.result()
+
+
+_END = object()
+
+
+def _buffer(it: Iterator[PyIO], n: int) -> Iterator[PyIO]:
+    # A dedicated thread, not a pool worker: it lives as long as the stream is consumed
+    buffered: queue.Queue = queue.Queue(maxsize=n)
+    stopped = threading.Event()
+
+    def offer(item) -> bool:
+        while not stopped.is_set():
+            try:
+                buffered.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                pass
+        return False
+
+    def produce() -> None:
+        try:
+            for state in it:
+                if not offer(state):
+                    return
+        except BaseException as ex:
+            offer(PyIO(None, ex))
+        finally:
+            _close(it)
+            offer(_END)
+
+    threading.Thread(target=produce, name="pyio-stream-buffer", daemon=True).start()
+    try:
+        while True:
+            item = buffered.get()
+            if item is _END:
+                return
+            yield item
+    finally:
+        # The consumer stopped early: unblock the producer so it closes upstream
+        stopped.set()
+
+
+def _throttle(it: Iterator[PyIO], interval: float) -> Iterator[PyIO]:
+    next_slot = time.monotonic()
+    for state in it:
+        wait = next_slot - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+        next_slot = max(next_slot, time.monotonic() - interval) + interval
+        yield state
+
+
+def _close(it: Iterator) -> None:
+    # Stop a pipeline of generators straight away, so map_par/buffer release their work
+    close = getattr(it, "close", None)
+    if close is not None:
+        close()
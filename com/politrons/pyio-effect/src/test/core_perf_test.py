@@ -0,0 +1,134 @@
+"""
+core_perf_test.py
+─────────────────
+Micro-benchmark: per-step overhead of the eager PyIO operators.
+
+Every case chains `--steps` calls of one operator on a fresh PyIO and is measured twice:
+    1. time       → best of `--repeat` runs, reported as nanoseconds per step (perf_counter)
+    2. memory     → bytes allocated per step and still alive at the end of a chain
+                    that keeps every intermediate PyIO (tracemalloc)
+
+Cases cover the success path (map, flat_map, filter, when), the empty path (map returning None),
+the failure path (the error is captured once, then propagated) and recovery.
+
+Run it against two checkouts to compare versions, e.g. before and after a change to core.py.
+Results are printed as a table and can be written as JSON with `--json out.json`.
+Passing `--baseline previous.json` compares against a previous run and exits with 1
+when any case is slower than `--threshold` times its baseline.
+
+    PYTHONPATH=src python src/test/core_perf_test.py --steps 100000 --json bench.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass, asdict
+from time import perf_counter
+from typing import Callable, Optional
+
+from pyio_effect import PyIO
+
+
+@dataclass
+class Case:
+    name: str
+    step: Callable[[PyIO], PyIO]
+
+
+@dataclass
+class Result:
+    case: str
+    steps: int
+    ns_per_step: float
+    bytes_per_step: float
+
+
+def _fail(n: int) -> int:
+    raise ValueError(n)
+
+
+def build_cases() -> list[Case]:
+    return [
+        Case("map", lambda io: io.map(lambda n: n + 1)),
+        Case("map[empty]", lambda io: io.map(lambda n: None)),
+        Case("flat_map", lambda io: io.flat_map(lambda n: PyIO(n + 1))),
+        Case("filter[keep]", lambda io: io.filter(lambda n: True)),
+        Case("filter[drop]", lambda io: io.filter(lambda n: False)),
+        Case("when", lambda io: io.when(lambda n: True, lambda n: n + 1)),
+        Case("map[failure]", lambda io: io.map(_fail)),
+        Case("recover", lambda io: io.map(_fail).recover(lambda ex: 1)),
+        Case("on_success", lambda io: io.on_success(lambda n: None)),
+    ]
+
+
+def _chain(case: Case, steps: int, keep: Optional[list]) -> None:
+    # Each step starts from a fresh success, so empty/failure cases measure one capture per step
+    for _ in range(steps):
+        out = case.step(PyIO(1))
+        if keep is not None:
+            keep.append(out)
+
+
+def measure(case: Case, steps: int, runs: int) -> Result:
+    times = []
+    for _ in range(runs):
+        start = perf_counter()
+        _chain(case, steps, None)
+        times.append(perf_counter() - start)
+    tracemalloc.start()
+    kept: list = []
+    _chain(case, steps, kept)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(case.name, steps, min(times) / steps * 1e9, size / steps)
+
+
+def run_suite(steps: int, runs: int, only: Optional[str] = None) -> list[Result]:
+    return [measure(case, steps, runs) for case in build_cases() if only is None or only in case.name]
+
+
+def print_table(results: list[Result]) -> None:
+    print(f"{'case':<16}{'ns/step':>12}{'bytes/step':>14}")
+    for r in results:
+        print(f"{r.case:<16}{r.ns_per_step:>12.1f}{r.bytes_per_step:>14.1f}")
+
+
+def regressions(results: list[Result], baseline: list[dict], threshold: float) -> list[str]:
+    previous = {b["case"]: b for b in baseline}
+    slower = []
+    for r in results:
+        before = previous.get(r.case)
+        if before and r.ns_per_step > before["ns_per_step"] * threshold:
+            slower.append(f"{r.case}: {before['ns_per_step']:.1f} -> {r.ns_per_step:.1f} ns/step")
+    return slower
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description="PyIO per-step micro-benchmark")
+    parser.add_argument("--steps", type=int, default=100_000, help="operator calls per run")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per case")
+    parser.add_argument("--only", help="run only the cases whose name contains this text")
+    parser.add_argument("--json", help="write machine readable results to this file")
+    parser.add_argument("--baseline", help="previous JSON results to compare with")
+    parser.add_argument("--threshold", type=float, default=1.25, help="slowdown ratio reported as regression")
+    args = parser.parse_args()
+
+    results = run_suite(args.steps, args.repeat, args.only)
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump([asdict(r) for r in results], f, indent=2)
+    if args.baseline:
+        with open(args.baseline) as f:
+            slower = regressions(results, json.load(f), args.threshold)
+        for line in slower:
+            print(f"REGRESSION {line}")
+        return 1 if slower else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
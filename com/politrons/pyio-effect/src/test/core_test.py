@@ -1,6 +1,32 @@
 from __future__ import annotations
 
-from pyio_effect import PyIO
+import asyncio
+import json
+import time
+
+from pyio_effect import PyIO, AsyncPyIO, PyIOStream, RetryPolicy
+
+
+async def fetch_price(product: str) -> float:
+    await asyncio.sleep(0.1)  # simulate a non-blocking I/O call
+    return 10.0 if product == "book" else 25.0
+
+
+async def async_effects() -> None:
+    total = await (AsyncPyIO("book")
+                   .map(fetch_price)
+                   .on_parallel(lambda p: fetch_price("pen"), lambda p: fetch_price("bag"), lambda a, b: a + b)
+                   .get())
+    print(total)
+
+    pair = await AsyncPyIO.defer(fetch_price).zip_par(AsyncPyIO("pen").map(fetch_price)).run("book")
+    print(pair.get())
+
+    recovered = await (AsyncPyIO(1)
+                       .map(lambda n: n // 0)
+                       .recover(lambda ex: 0)
+                       .get())
+    print(recovered)
 
 # ----------------------------- Main ---------------------------------
 if __name__ == "__main__":
@@ -87,3 +113,150 @@ if __name__ == "__main__":
                .when(lambda n: n > 10, lambda n: n * 100)
                .get())
     print(content)
+
+    """
+    [defer] builds a lazy program, nothing runs until [run]. The same program can be run many times,
+    with a different input each time.
+    """
+    parse = (PyIO.defer(lambda raw: raw)
+             .map(json.loads)
+             .map(lambda doc: doc["amount"] * 2)
+             .recover(lambda ex: 0))
+    print(parse.run('{"amount": 21}').get())
+    print(parse.run("not json").get())
+    # Each is_success/get on the program itself would run it again: inspect the outcome of one run
+    runs = []
+    counted = PyIO.defer(lambda: runs.append(1) or len(runs))
+    state = counted.run()
+    print(state.is_success(), state.get(), len(runs))
+
+    """
+    [AsyncPyIO] same operators on asyncio, coroutine functions are awaited and [on_parallel]/[zip_par]
+    run concurrently on the event loop with asyncio.gather.
+    """
+    asyncio.run(async_effects())
+
+    """
+    [par_map] runs N functions over the same value and [traverse_par] one function over N items, on a shared
+    executor, with bounded concurrency and failing fast on the first error.
+    """
+    content = (PyIO[int](3)
+               .par_map([lambda n: n * 2, lambda n: n ** 2, str], max_concurrency=3)
+               .get())
+    print(content)
+
+    content = PyIO.traverse_par(range(10), lambda n: n * 10, max_concurrency=4).get()
+    print(content)
+
+    failed = PyIO.traverse_par(range(10), lambda n: 10 // (n - 5), max_concurrency=4)
+    print(failed.is_error())
+
+    """
+    [retry] runs a deferred program again while it fails, with exponential backoff and jitter, [timeout] fails it
+    when it takes too long, [race] keeps the first of two programs to succeed and [hedge] starts a backup copy
+    when the first one is slow.
+    """
+    attempts = []
+    flaky = PyIO.defer(lambda: attempts.append(1) or 10 // (len(attempts) - 1))  # fails on the first attempt
+    print(flaky.retry(RetryPolicy(max_attempts=5, initial_delay=0.01)).get())
+    checks = []
+    # A predicate that raises counts as a failed attempt as well
+    picky = PyIO.defer(lambda: checks.append(1) or len(checks) - 1).filter(lambda n: 1 / n)
+    print(picky.retry(RetryPolicy(max_attempts=5, initial_delay=0.01)).get(), len(checks))
+
+    slow = PyIO.defer(lambda: time.sleep(0.5) or "slow")
+    fast = PyIO.defer(lambda: time.sleep(0.05) or "fast")
+    print(slow.timeout(0.1).run().is_error())
+    print(slow.race(fast).get())
+    print(fast.hedge(after_ms=10).get())
+
+    """
+    [cached] memoizes an effectful function: the same key within the ttl is computed only once,
+    even when several calls for it are in flight at the same time.
+    """
+    lookups = []
+
+    @PyIO.cached(ttl=60, maxsize=100)
+    def fetch_stock(product: str) -> int:
+        lookups.append(product)
+        time.sleep(0.05)
+        return len(product)
+
+    content = PyIO.traverse_par(["book", "pen", "book", "book"], lambda p: fetch_stock(p).get()).get()
+    print(content, lookups)
+
+    @PyIO.cached()
+    def broken(product: str) -> PyIO:
+        return PyIO.defer(lambda: product).filter(lambda p: p / 0)
+
+    # A computation that raises is not kept in flight: every call tries again instead of waiting forever
+    for _ in range(2):
+        try:
+            broken("book")
+        except TypeError as ex:
+            print(f"not cached: {ex}")
+
+    """
+    [batched] coalesces the lookups issued at the same time into a single bulk call, data-loader style.
+    """
+    bulk_calls = []
+
+    def fetch_stocks(products: list) -> dict:
+        bulk_calls.append(products)
+        return {p: len(p) for p in products}
+
+    stocks = PyIO.batched(fetch_stocks, max_batch=50, max_wait_ms=10)
+    content = PyIO.traverse_par(["book", "pen", "bag"], lambda p: stocks(p).get()).get()
+    print(content, bulk_calls)
+    print(stocks.load_many(["pen", "cup"]).get())
+
+    """
+    [bracket] always releases what it acquired, also when the use fails, and [pool] reuses a few
+    resources across many runs.
+    """
+    log = []
+    content = PyIO.bracket(lambda: log.append("open") or "conn",
+                           lambda conn: 10 // 0,
+                           lambda conn: log.append("close"))
+    print(content.is_error(), log)
+    content = PyIO.bracket(lambda: log.append("open") or "conn",
+                           lambda conn: PyIO.defer(lambda: 0).filter(lambda n: 1 / n),
+                           lambda conn: log.append("close"))
+    print(content.is_error(), log)
+
+    opened = []
+    connections = PyIO.pool(lambda: opened.append(1) or f"conn-{len(opened)}", size=2)
+    content = PyIO.traverse_par(range(6), lambda n: connections.use(lambda conn: time.sleep(0.01) or n).get()).get()
+    print(content, len(opened))
+    connections.close()
+
+    """
+    [tracing] records each map/flat_map/on_parallel step with its duration, thread and outcome,
+    exportable as Chrome trace-event JSON.
+    """
+    with PyIO.tracing() as trace:
+        (PyIO[int](5)
+         .map(lambda n: n * 2)
+         .on_parallel(lambda n: n + 1, lambda n: n - 1, lambda a, b: a * b)
+         .flat_map(lambda n: PyIO(n // 0))
+         .get_or_else(0))
+    print([(e.kind, e.outcome) for e in trace.events])
+    print(len(json.dumps(trace.to_chrome())) > 0)
+
+    """
+    [PyIOStream] processes a sequence lazily, one PyIO per element: an error fails only its element, [map_par]
+    runs N elements concurrently and [run_collect]/[run_drain] run the whole stream in constant memory.
+    """
+    content = (PyIOStream(["1", "2", "x", "4"])
+               .map(int)
+               .recover(lambda ex: 0)
+               .map_par(lambda n: n * 10, 2)
+               .run_collect()
+               .get())
+    print(content)
+    print(PyIOStream(range(100_000)).filter(lambda n: n % 3 == 0).run_drain().get())
+    print(PyIOStream([1, 0, 2]).filter(lambda n: 1 / n).recover(lambda ex: -1).run_collect().get())
+    # Nested in a parallel operator, map_par runs the elements no worker picked up instead of waiting for them
+    nested = PyIO.traverse_par(range(50), lambda n: PyIOStream(range(4)).map_par(lambda x: x + n, 2).run_collect().get())
+    print(len(nested.get()))
+